@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class ApiConfig(AppConfig):
+    name = "api"
+
+    def ready(self):
+        # Project-wide hooks, independent of which apps are installed.
+        import api.checks
+        import api.database
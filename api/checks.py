@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+LOCMEM_CACHE = "django.core.cache.backends.locmem.LocMemCache"
+
+
+@register(Tags.caches)
+def check_session_cache(app_configs, **kwargs):
+    # A cached_db session deleted at logout would stay readable from the
+    # other workers' private copies until it expired.
+    if settings.SESSION_ENGINE != "django.contrib.sessions.backends.cached_db":
+        return []
+    cache = settings.CACHES.get(settings.SESSION_CACHE_ALIAS, {})
+    if cache.get("BACKEND") != LOCMEM_CACHE:
+        return []
+    return [
+        Error(
+            f"SESSION_BACKEND=cached_db reads sessions from the per-process "
+            f"'{settings.SESSION_CACHE_ALIAS}' cache, so logouts do not reach "
+            f"other workers.",
+            hint="Set RESPONSE_CACHE_BACKEND to 'file' or 'db', or point "
+            "SESSION_CACHE_ALIAS at another shared cache.",
+            id="api.E001",
+        )
+    ]
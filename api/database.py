@@ -0,0 +1,18 @@
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """
+    Run ``PRAGMA name = value`` for each entry of the connection's
+    ``DATABASES[alias]["PRAGMAS"]`` when it opens. SQLite pragmas last for
+    the connection, so with persistent connections this runs once per worker
+    rather than once per request.
+    """
+    pragmas = connection.settings_dict.get("PRAGMAS")
+    if connection.vendor != "sqlite" or not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
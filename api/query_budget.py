@@ -0,0 +1,127 @@
+import logging
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_budget(max_queries):
+    """
+    Declare how many queries a view may run per request (authentication and
+    session lookups included). Works on function views and view classes.
+    """
+
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+
+    return decorator
+
+
+class QueryCounter:
+    def __init__(self):
+        self.by_alias = {}
+
+    @property
+    def count(self):
+        return sum(self.by_alias.values())
+
+    def wrapper(self, alias):
+        self.by_alias[alias] = 0
+
+        def count(execute, sql, params, many, context):
+            self.by_alias[alias] += 1
+            return execute(sql, params, many, context)
+
+        return count
+
+
+class QueryBudgetMiddleware:
+    """
+    Count the queries run while handling each request and, with ``DEBUG`` or
+    ``QUERY_COUNT_HEADER`` on, report them in the ``X-Query-Count`` response
+    header, split per database alias in ``X-Query-Count-By-Alias`` when there
+    is more than one.
+
+    When the resolved view declares a budget with ``@query_budget`` and the
+    request goes over it, the overrun is logged, or raised as
+    ``QueryBudgetExceeded`` when ``QUERY_BUDGET_STRICT`` is on (the default
+    under ``manage.py test``) so that the offending test fails.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        counter = QueryCounter()
+        with self.count_queries(counter):
+            response = self.get_response(request)
+        return self.report(request, response, counter)
+
+    async def __acall__(self, request):
+        # Database connections are per thread, and an async view's ORM calls
+        # run in the request's sync_to_async thread, not on the event loop,
+        # so the counting wrappers are installed there.
+        counter = QueryCounter()
+        stack = await sync_to_async(self.count_queries)(counter)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.report(request, response, counter)
+
+    def count_queries(self, counter):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(
+                connection.execute_wrapper(counter.wrapper(connection.alias))
+            )
+        return stack
+
+    def report(self, request, response, counter):
+        if settings.DEBUG or settings.QUERY_COUNT_HEADER:
+            response["X-Query-Count"] = str(counter.count)
+            if len(counter.by_alias) > 1:
+                response["X-Query-Count-By-Alias"] = ", ".join(
+                    f"{alias}={count}" for alias, count in counter.by_alias.items()
+                )
+        logger.debug(
+            "%s %s ran %d queries", request.method, request.path, counter.count
+        )
+
+        budget = self.get_budget(request)
+        if budget is not None and counter.count > budget:
+            message = (
+                f"{request.method} {request.path} ran {counter.count} queries, "
+                f"over its budget of {budget}"
+            )
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    @staticmethod
+    def get_budget(request):
+        # Looked up from the resolved view once the response is back, rather
+        # than in process_view, which ASGI would run in a worker thread.
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return None
+        view_class = getattr(match.func, "view_class", None)
+        return getattr(
+            match.func, "query_budget", getattr(view_class, "query_budget", None)
+        )
@@ -0,0 +1,116 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework import serializers
+
+
+def optimize_for_serializer(queryset, serializer_class):
+    """
+    Return ``queryset`` with the ``select_related``/``prefetch_related`` and
+    ``only()`` calls needed to render ``serializer_class`` without N+1 queries.
+
+    The plan is derived from the serializer's declared (readable) fields:
+    dotted sources and nested serializers become joins, many-valued fields
+    become prefetches, and plain model fields restrict the selected columns.
+    When a field's source cannot be mapped onto model columns (``source="*"``,
+    properties, methods) every column is kept. Fields named in the
+    serializer's ``Meta.annotated_fields`` are filled by queryset annotations
+    and need no columns.
+    """
+    return _optimize(queryset, serializer_class())
+
+
+def _optimize(queryset, serializer, keep=()):
+    pk_name = queryset.model._meta.pk.name
+    plan = {"only": {pk_name, *keep}, "select": set(), "prefetch": []}
+    _walk(serializer, queryset.model, [], plan)
+
+    if plan["select"]:
+        queryset = queryset.select_related(*sorted(plan["select"]))
+    if plan["prefetch"]:
+        queryset = queryset.prefetch_related(*plan["prefetch"])
+    if plan["only"] is not None:
+        queryset = queryset.only(*sorted(plan["only"]))
+    return queryset
+
+
+def _keep(plan, path):
+    if plan["only"] is not None:
+        plan["only"].add(LOOKUP_SEP.join(path))
+
+
+def _walk(serializer, model, prefix, plan):
+    annotated = getattr(getattr(serializer, "Meta", None), "annotated_fields", ())
+    for field in serializer.fields.values():
+        if field.write_only or field.source in annotated:
+            continue
+        if field.source == "*":
+            plan["only"] = None
+            continue
+
+        current, path = model, list(prefix)
+        for attr in field.source_attrs[:-1]:
+            model_field = _get_model_field(current, attr)
+            if model_field is None or not (
+                model_field.many_to_one or model_field.one_to_one
+            ):
+                plan["only"] = None
+                break
+            path.append(attr)
+            _keep(plan, path)
+            plan["select"].add(LOOKUP_SEP.join(path))
+            current = model_field.related_model
+        else:
+            _plan_field(field, current, path, plan)
+
+
+def _plan_field(field, model, path, plan):
+    attr = field.source_attrs[-1]
+    model_field = _get_model_field(model, attr)
+    if model_field is None:
+        plan["only"] = None
+        return
+
+    path = path + [attr]
+    lookup = LOOKUP_SEP.join(path)
+
+    if isinstance(field, serializers.ListSerializer):
+        related = model_field.related_model._default_manager.all()
+        keep = _back_reference(model_field)
+        plan["prefetch"].append(
+            Prefetch(lookup, queryset=_optimize(related, field.child, keep))
+        )
+    elif isinstance(field, serializers.ManyRelatedField):
+        related = model_field.related_model._default_manager.all()
+        columns = [related.model._meta.pk.name] + _back_reference(model_field)
+        if isinstance(field.child_relation, serializers.SlugRelatedField):
+            columns.append(field.child_relation.slug_field)
+        plan["prefetch"].append(Prefetch(lookup, queryset=related.only(*columns)))
+    elif isinstance(field, serializers.BaseSerializer):
+        _keep(plan, path)
+        plan["select"].add(lookup)
+        _walk(field, model_field.related_model, path, plan)
+    elif isinstance(field, serializers.SlugRelatedField):
+        _keep(plan, path)
+        plan["select"].add(lookup)
+        _keep(plan, path + [field.slug_field])
+    else:
+        _keep(plan, path)
+
+
+def _back_reference(model_field):
+    # A reverse foreign key prefetch matches rows on the child's FK column,
+    # so it has to stay loaded; many-to-many prefetches join the through table.
+    if model_field.one_to_many:
+        return [model_field.field.name]
+    return []
+
+
+def _get_model_field(model, name):
+    try:
+        model_field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    if not model_field.is_relation and not model_field.concrete:
+        return None
+    return model_field
@@ -0,0 +1,52 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.dispatch import receiver
+
+# Set once the current request (or task) has written to the primary.
+_pinned = ContextVar("pinned_to_primary", default=False)
+
+
+def pin_to_primary():
+    _pinned.set(True)
+
+
+@receiver(request_started)
+def unpin(**kwargs):
+    _pinned.set(False)
+
+
+class PrimaryReplicaRouter:
+    """
+    Send reads of ``REPLICA_APPS`` models to a random alias from
+    ``DATABASE_REPLICA_ALIASES`` and every write to ``default``. Related
+    rows of an instance read from a replica come from the same replica.
+
+    Reads stay on the primary once the request has written, so it always
+    sees its own changes, and while a transaction is open on the primary, so
+    a transaction never mixes two snapshots. ``request_started`` resets the
+    pin for each request.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICA_ALIASES
+        if _pinned.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if replicas and model._meta.app_label in settings.REPLICA_APPS:
+            return random.choice(replicas)
+        # Other models follow the instance they were reached from, if any.
+        return None
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICA_ALIASES}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
@@ -0,0 +1,101 @@
+import hashlib
+import os
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.views import View
+from drf_spectacular.views import SpectacularAPIView
+
+# Precompressed variants written next to SCHEMA_FILE by `build_schema`, in
+# order of preference.
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+_lock = threading.Lock()
+_loaded = {}
+
+
+def load_schema(path=None):
+    """
+    Return ``{encoding: (body, etag)}`` for the built schema, including the
+    ``"identity"`` body, or ``None`` if it has not been built. Files are read
+    once per process and again only when the schema file changes.
+    """
+    path = str(path or settings.SCHEMA_FILE)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    with _lock:
+        cached = _loaded.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        variants = {}
+        with open(path, "rb") as fh:
+            body = fh.read()
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        variants["identity"] = (body, f'"{digest}"')
+        for encoding, suffix in ENCODINGS:
+            try:
+                with open(path + suffix, "rb") as fh:
+                    variants[encoding] = (fh.read(), f'"{digest}-{encoding}"')
+            except FileNotFoundError:
+                pass
+        _loaded[path] = (mtime, variants)
+        return variants
+
+
+def _accepted(request, encoding):
+    accept = request.META.get("HTTP_ACCEPT_ENCODING", "")
+    return any(
+        part.split(";")[0].strip() == encoding and "q=0" not in part.replace(" ", "")
+        for part in accept.split(",")
+    )
+
+
+class PrecompiledSchemaView(View):
+    """
+    Serve the OpenAPI schema built by ``manage.py build_schema`` as a static
+    file: no authentication, throttling or view introspection, a strong ETag,
+    and brotli/gzip variants when the client accepts them.
+
+    Requests for another format (``?format=json``, ``?lang=``) or a missing
+    build fall back to the live drf-spectacular view.
+    """
+
+    live_view = staticmethod(SpectacularAPIView.as_view())
+    content_type = "application/vnd.oai.openapi; charset=utf-8"
+
+    def get(self, request, *args, **kwargs):
+        variants = load_schema()
+        accept = request.META.get("HTTP_ACCEPT", "")
+        if (
+            variants is None
+            or set(request.GET) - {"format"}
+            or request.GET.get("format", "openapi") not in ("openapi", "yaml")
+            or "json" in accept
+        ):
+            return self.live_view(request, *args, **kwargs)
+
+        encoding = next(
+            (
+                name
+                for name, _ in ENCODINGS
+                if name in variants and _accepted(request, name)
+            ),
+            "identity",
+        )
+        body, etag = variants[encoding]
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(body, content_type=self.content_type)
+            if encoding != "identity":
+                response["Content-Encoding"] = encoding
+        response["ETag"] = etag
+        response["Cache-Control"] = "no-cache"
+        patch_vary_headers(response, ["Accept-Encoding"])
+        return response
@@ -10,8 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import sys
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 from datetime import timedelta
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -27,6 +28,8 @@ SECRET_KEY = "django-insecure-of+#ofs6o!9$3tzq+*ch77e!x(w^qv9&mqe4hw!d)v+#pr-g1+
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
+TESTING = len(sys.argv) > 1 and sys.argv[1] == "test"
+
 ALLOWED_HOSTS = [
     "localhost",
     "127.0.0.1",
@@ -58,15 +61,33 @@ INSTALLED_APPS = [
     "rest_framework_simplejwt.token_blacklist",
     "corsheaders",
     "django_filters",
+    "api",
     "users",
     "events",
 ]
 
 # Rest Framework
 
+# Throttle state (GCRA, one row per client) shared by all workers on the host.
+# THROTTLE_ENABLED=False turns throttling off, e.g. for the loadtest command.
+THROTTLE_DATABASE = config(
+    "THROTTLE_DATABASE",
+    default=":memory:" if TESTING else str(BASE_DIR / ".cache" / "throttle.sqlite3"),
+)
+THROTTLE_ENABLED = config("THROTTLE_ENABLED", default=True, cast=bool)
+
+# Opt in to authenticating access tokens from their claims alone (no user
+# query); blacklisted sessions are picked up every JWT_REVOCATION_REFRESH seconds
+JWT_STATELESS_AUTH = config("JWT_STATELESS_AUTH", default=False, cast=bool)
+JWT_REVOCATION_REFRESH = config("JWT_REVOCATION_REFRESH", default=30, cast=int)
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        (
+            "users.authentication.StatelessJWTAuthentication"
+            if JWT_STATELESS_AUTH
+            else "rest_framework_simplejwt.authentication.JWTAuthentication"
+        ),
         "rest_framework.authentication.SessionAuthentication",
         "rest_framework.authentication.BasicAuthentication",
     ),
@@ -75,20 +96,89 @@ REST_FRAMEWORK = {
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "api.throttling.SharedAnonRateThrottle",
+        "api.throttling.SharedUserRateThrottle",
+        "api.throttling.SharedScopedRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "anon": "60/hour",
         "user": "2000/day",
+        # Per-view scopes, set with ``throttle_scope`` on the view
+        "login": config("THROTTLE_RATE_LOGIN", default="10/minute"),
+        "signup": config("THROTTLE_RATE_SIGNUP", default="5/hour"),
+        "event_registration": config(
+            "THROTTLE_RATE_EVENT_REGISTRATION", default="30/minute"
+        ),
     },
 }
 
+# Event list pagination (keyset / cursor based)
+EVENT_LIST_PAGE_SIZE = config("EVENT_LIST_PAGE_SIZE", default=20, cast=int)
+EVENT_LIST_MAX_PAGE_SIZE = config("EVENT_LIST_MAX_PAGE_SIZE", default=100, cast=int)
+
+# Rows fetched per round trip by the streaming event export
+EVENT_EXPORT_CHUNK_SIZE = config("EVENT_EXPORT_CHUNK_SIZE", default=2000, cast=int)
+
+# Bulk event creation: events inserted per INSERT, and items accepted per request
+EVENT_BULK_CREATE_BATCH_SIZE = config(
+    "EVENT_BULK_CREATE_BATCH_SIZE", default=500, cast=int
+)
+EVENT_BULK_CREATE_MAX_ITEMS = config(
+    "EVENT_BULK_CREATE_MAX_ITEMS", default=1000, cast=int
+)
+
+# Event list facets: buckets returned per facet by default, and at most
+EVENT_FACET_BUCKETS = config("EVENT_FACET_BUCKETS", default=10, cast=int)
+EVENT_FACET_MAX_BUCKETS = config("EVENT_FACET_MAX_BUCKETS", default=50, cast=int)
+
+# Longest from/to range, in days, the event calendar counts over
+EVENT_CALENDAR_MAX_DAYS = config("EVENT_CALENDAR_MAX_DAYS", default=731, cast=int)
+
+# "Events near me": events are indexed by a grid of GEO_CELL_DEGREES squares
+# (changing it needs `manage.py rebuild_geo_cells`); radius_km defaults to
+# GEO_DEFAULT_RADIUS_KM and is capped at GEO_MAX_RADIUS_KM
+GEO_CELL_DEGREES = config("GEO_CELL_DEGREES", default=0.1, cast=float)
+GEO_DEFAULT_RADIUS_KM = config("GEO_DEFAULT_RADIUS_KM", default=10, cast=float)
+GEO_MAX_RADIUS_KM = config("GEO_MAX_RADIUS_KM", default=500, cast=float)
+
+# Status lifecycle: how long an event stays ONGOING after it starts, how many
+# rows each UPDATE touches, and the scheduler loop interval in seconds
+EVENT_ONGOING_DURATION = timedelta(
+    hours=config("EVENT_ONGOING_HOURS", default=24, cast=int)
+)
+EVENT_STATUS_BATCH_SIZE = config("EVENT_STATUS_BATCH_SIZE", default=5000, cast=int)
+EVENT_STATUS_INTERVAL = config("EVENT_STATUS_INTERVAL", default=60, cast=int)
+
+# Group membership cache used by role checks: shared cache alias and timeout,
+# plus a per-process LRU whose entries live ROLE_CACHE_LOCAL_TTL seconds. The
+# alias must name a cache every worker shares (the response cache with the
+# "file" or "db" backend) for a revoked role to lose its access everywhere
+# within ROLE_CACHE_LOCAL_TTL rather than ROLE_CACHE_TIMEOUT seconds.
+ROLE_CACHE_ALIAS = config("ROLE_CACHE_ALIAS", default="responses")
+ROLE_CACHE_TIMEOUT = config("ROLE_CACHE_TIMEOUT", default=300, cast=int)
+ROLE_CACHE_LOCAL_SIZE = config("ROLE_CACHE_LOCAL_SIZE", default=1024, cast=int)
+ROLE_CACHE_LOCAL_TTL = config("ROLE_CACHE_LOCAL_TTL", default=5, cast=int)
+
+# API keys: HMAC secret for stored key hashes, the cache verified keys are
+# kept in and for how many seconds, and how often last_used_at timestamps are
+# written back. Verifications live in the response cache: when it is shared
+# ("file" or "db"), revoking a key takes effect in every worker at once; with
+# the per-process "locmem" default, other processes (web workers, and every
+# web worker after `generate_api_key --rotate`) keep accepting a revoked key
+# for up to API_KEY_CACHE_TIMEOUT seconds.
+API_KEY_SECRET = config("API_KEY_SECRET", default=SECRET_KEY)
+API_KEY_CACHE_ALIAS = "responses"
+API_KEY_CACHE_TIMEOUT = config("API_KEY_CACHE_TIMEOUT", default=5, cast=int)
+API_KEY_USAGE_FLUSH_INTERVAL = config(
+    "API_KEY_USAGE_FLUSH_INTERVAL", default=60, cast=int
+)
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "BLACKLIST_AFTER_ROTATION": True,
     "UPDATE_LAST_LOGIN": False,
+    "TOKEN_REFRESH_SERIALIZER": "users.tokens.RoleTokenRefreshSerializer",
 }
 
 SPECTACULAR_SETTINGS = {
@@ -97,7 +187,8 @@ SPECTACULAR_SETTINGS = {
     "This API allows for managing local events, including user authentication, event creation, registration, and searching/filtering of events.\n\n"
     "**Default Throttling:**\n\n"
     "* **Unauthenticated**: 60 requests per hour\n"
-    "* **Authenticated**: 2000 requests per day\n\n",
+    "* **Authenticated**: 2000 requests per day\n\n"
+    "Login, sign-up and event registration have their own, stricter limits.\n\n",
     "VERSION": "1.0.0",
     "SERVERS": [
         {"url": "http://127.0.0.1:8000", "description": "Local server"},
@@ -105,6 +196,9 @@ SPECTACULAR_SETTINGS = {
     "SERVE_INCLUDE_SCHEMA": False,
     "COMPONENT_SPLIT_REQUEST": True,
     "SCHEMA_PATH_PREFIX": "/api/v[0-9]",
+    # Served locally from dist/ (see STATICFILES_DIRS) instead of a CDN
+    "SWAGGER_UI_DIST": "/static/swagger-ui",
+    "SWAGGER_UI_FAVICON_HREF": "/static/swagger-ui/favicon-32x32.png",
     "SWAGGER_UI_SETTINGS": {
         "deepLinking": True,
         "defaultModelRendering": "model",
@@ -120,11 +214,16 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
+# Schema served at /api/schema/, written with its .gz/.br variants by
+# `manage.py build_schema`; without it the schema is generated per request
+SCHEMA_FILE = BASE_DIR / "swagger.yml"
+
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "api.static.AsyncWhiteNoiseMiddleware",
+    "api.query_budget.QueryBudgetMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -133,6 +232,14 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Views decorated with @query_budget log when they run more queries than
+# declared; in strict mode (on for the test suite) the request fails instead.
+# The X-Query-Count headers tell clients how much work each view does, so
+# they are only sent with DEBUG or QUERY_COUNT_HEADER on (the test suite, and
+# a server measured by `loadtest --url`).
+QUERY_BUDGET_STRICT = config("QUERY_BUDGET_STRICT", default=TESTING, cast=bool)
+QUERY_COUNT_HEADER = config("QUERY_COUNT_HEADER", default=TESTING, cast=bool)
+
 ROOT_URLCONF = "api.urls"
 
 TEMPLATES = [
@@ -158,13 +265,66 @@ WSGI_APPLICATION = "api.wsgi.application"
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
 
+# DATABASE_PROFILE "production" keeps connections open for DB_CONN_MAX_AGE
+# seconds (checked before reuse) and applies SQLITE_PRAGMAS to each new one:
+# WAL so readers never wait for the writer, busy_timeout so writers queue
+# instead of failing with "database is locked", and a memory-mapped file plus
+# a larger page cache for reads. "development" is plain SQLite. Compare the
+# two with `manage.py bench_database`.
+DATABASE_PROFILE = config("DATABASE_PROFILE", default="development")
+PRODUCTION_DATABASE = DATABASE_PROFILE == "production"
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": config("SQLITE_BUSY_TIMEOUT", default=5000, cast=int),
+    "mmap_size": config("SQLITE_MMAP_SIZE", default=256 * 1024 * 1024, cast=int),
+    "cache_size": -config("SQLITE_CACHE_KB", default=64 * 1024, cast=int),
+    "temp_store": "MEMORY",
+}
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        # django.db.backends.sqlite3 plus Django 5.1's "transaction_mode"
+        "ENGINE": "api.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Take the write lock when a transaction begins, so writers queue on
+        # busy_timeout instead of failing on a stale snapshot.
+        "OPTIONS": {"transaction_mode": "IMMEDIATE"} if PRODUCTION_DATABASE else {},
+        "CONN_MAX_AGE": (
+            config("DB_CONN_MAX_AGE", default=600, cast=int)
+            if PRODUCTION_DATABASE
+            else 0
+        ),
+        "CONN_HEALTH_CHECKS": PRODUCTION_DATABASE,
+        "PRAGMAS": SQLITE_PRAGMAS if PRODUCTION_DATABASE else {},
     }
 }
 
+# Read replicas: each file in the comma separated DATABASE_REPLICAS (a copy
+# kept in sync with the primary, e.g. by LiteFS) becomes an alias "replica",
+# "replica_2", ... Reads of REPLICA_APPS models go to one of them unless the
+# request has already written or a transaction is open; writes always go to
+# "default". The test suite gets one replica in its own file, which only the
+# routing tests switch on. A replica may trail the primary by up to
+# DATABASE_REPLICA_MAX_LAG seconds, so for that long after any change the
+# response cache is filled from the primary instead.
+REPLICA_APPS = ["events"]
+DATABASE_REPLICA_MAX_LAG = config("DATABASE_REPLICA_MAX_LAG", default=5, cast=float)
+DATABASE_REPLICAS = config("DATABASE_REPLICAS", default="", cast=Csv())
+DATABASE_REPLICA_ALIASES = []
+for index, name in enumerate(
+    DATABASE_REPLICAS or ([BASE_DIR / "db_replica.sqlite3"] if TESTING else []), 1
+):
+    alias = "replica" if index == 1 else f"replica_{index}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "NAME": name,
+        "TEST": {"NAME": BASE_DIR / f"test_{alias}.sqlite3"},
+    }
+    if DATABASE_REPLICAS:
+        DATABASE_REPLICA_ALIASES.append(alias)
+DATABASE_ROUTERS = ["api.routers.PrimaryReplicaRouter"]
+
 # DATABASES = {
 #     "default": {
 #         "ENGINE": "django.db.backends.postgresql",
@@ -177,6 +337,41 @@ DATABASES = {
 # }
 
 
+# Caches
+# The response cache backs the event list and category endpoints. Use "file"
+# or "db" (SQLite, run `manage.py createcachetable` first) so that every
+# gunicorn worker on the host shares the same entries.
+
+RESPONSE_CACHE_ALIAS = "responses"
+RESPONSE_CACHE_TIMEOUT = config("RESPONSE_CACHE_TIMEOUT", default=300, cast=int)
+RESPONSE_CACHE_BACKENDS = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "responses",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": config(
+            "RESPONSE_CACHE_LOCATION", default=str(BASE_DIR / ".cache" / "responses")
+        ),
+    },
+    "db": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "response_cache",
+    },
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    RESPONSE_CACHE_ALIAS: {
+        **RESPONSE_CACHE_BACKENDS[config("RESPONSE_CACHE_BACKEND", default="locmem")],
+        "TIMEOUT": RESPONSE_CACHE_TIMEOUT,
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -200,7 +395,9 @@ AUTHENTICATION_BACKENDS = [
 ]
 
 # Email settings
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+EMAIL_BACKEND = config(
+    "EMAIL_BACKEND", default="django.core.mail.backends.smtp.EmailBackend"
+)
 EMAIL_HOST = "smtp.gmail.com"
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
@@ -208,6 +405,13 @@ EMAIL_HOST_USER = config("EMAIL_USER")
 EMAIL_HOST_PASSWORD = config("EMAIL_PWD")
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 
+# Outbox worker: emails sent per batch, delivery attempts before giving up,
+# base retry delay in seconds (doubled per attempt) and loop interval
+EMAIL_OUTBOX_BATCH_SIZE = config("EMAIL_OUTBOX_BATCH_SIZE", default=100, cast=int)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config("EMAIL_OUTBOX_MAX_ATTEMPTS", default=8, cast=int)
+EMAIL_OUTBOX_RETRY_DELAY = config("EMAIL_OUTBOX_RETRY_DELAY", default=30, cast=int)
+EMAIL_OUTBOX_INTERVAL = config("EMAIL_OUTBOX_INTERVAL", default=5, cast=int)
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
@@ -231,6 +435,9 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 # Directory where static files will be collected (optional if not using collectstatic)
 STATIC_ROOT = BASE_DIR / "staticfiles"
+# The Swagger UI bundle, served by WhiteNoise with the gzip/brotli variants
+# collectstatic writes (brotli needs the Brotli package)
+STATICFILES_DIRS = [("swagger-ui", BASE_DIR / "dist")]
 
 # Whitenoise settings
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
@@ -241,7 +448,19 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 
-SESSION_ENGINE = "django.contrib.sessions.backends.db"
+# Session storage: "db" (default), "cached_db" (reads served from
+# SESSION_CACHE_ALIAS, the response cache unless set; the system check refuses
+# a per-process locmem cache, which would keep a logged-out session alive in
+# other workers), or "signed_cookies" (no server-side rows, but a logout
+# cannot revoke a copied cookie before it expires). Sweep expired db rows with
+# `sweep_sessions`.
+SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+SESSION_ENGINE = SESSION_ENGINES[config("SESSION_BACKEND", default="db")]
+SESSION_CACHE_ALIAS = config("SESSION_CACHE_ALIAS", default=RESPONSE_CACHE_ALIAS)
 SESSION_COOKIE_NAME = "sessionid"
 SESSION_COOKIE_AGE = 1209600  # 2 weeks (in seconds)
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
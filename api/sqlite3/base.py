@@ -0,0 +1,25 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    The SQLite backend with Django 5.1's ``"transaction_mode"`` option.
+
+    With ``"IMMEDIATE"`` a transaction takes the write lock as it begins.
+    With the default deferred mode, a transaction that waited for the lock
+    finds its WAL snapshot stale and fails at once with "database is
+    locked", whatever busy_timeout says.
+    """
+
+    transaction_mode = None
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.transaction_mode = params.pop("transaction_mode", None)
+        return params
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode is None:
+            super()._start_transaction_under_autocommit()
+        else:
+            self.cursor().execute(f"BEGIN {self.transaction_mode}")
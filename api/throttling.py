@@ -0,0 +1,115 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.throttling import (
+    AnonRateThrottle,
+    ScopedRateThrottle,
+    SimpleRateThrottle,
+    UserRateThrottle,
+)
+
+
+class GCRAStore:
+    """
+    Generic cell rate algorithm state in a SQLite file shared by every worker
+    on the host.
+
+    Each throttle key is one row holding its theoretical arrival time (TAT),
+    so memory per client is fixed however high the rate. A request is
+    admitted by a single conditional UPSERT, which SQLite serializes across
+    processes; WAL mode keeps readers and the writer from blocking each
+    other.
+    """
+
+    # Fraction of requests that also purge rows whose TAT has passed.
+    purge_probability = 0.001
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS throttle "
+                "(key TEXT PRIMARY KEY, tat REAL NOT NULL) WITHOUT ROWID"
+            )
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key, limit, period, now=None):
+        """
+        Record one request for ``key`` against ``limit`` requests per
+        ``period`` seconds. Returns ``None`` if it is allowed, otherwise the
+        number of seconds until the next request would be.
+        """
+        now = time.time() if now is None else now
+        interval = period / limit
+        conn = self.connection()
+        row = conn.execute(
+            "INSERT INTO throttle (key, tat) VALUES (?1, ?2 + ?3) "
+            "ON CONFLICT (key) DO UPDATE SET tat = max(tat, ?2) + ?3 "
+            "WHERE max(tat, ?2) + ?3 - ?2 <= ?4 "
+            "RETURNING tat",
+            (key, now, interval, period),
+        ).fetchone()
+
+        if random.random() < self.purge_probability:
+            conn.execute("DELETE FROM throttle WHERE tat < ?", (now,))
+        if row is not None:
+            return None
+
+        (tat,) = conn.execute(
+            "SELECT tat FROM throttle WHERE key = ?", (key,)
+        ).fetchone()
+        return max(tat + interval - period - now, 0)
+
+    def clear(self):
+        self.connection().execute("DELETE FROM throttle")
+
+
+store = GCRAStore(settings.THROTTLE_DATABASE)
+
+
+class SharedRateThrottle(SimpleRateThrottle):
+    """
+    DRF's ``SimpleRateThrottle`` with the per-process cache history replaced
+    by the host-wide ``GCRAStore``. Rates, scopes and cache keys work as in
+    DRF; list this class after a DRF throttle to give it shared state.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None or not settings.THROTTLE_ENABLED:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self._wait = store.hit(self.key, self.num_requests, self.duration)
+        return self._wait is None
+
+    def wait(self):
+        return self._wait
+
+
+class SharedAnonRateThrottle(AnonRateThrottle, SharedRateThrottle):
+    pass
+
+
+class SharedUserRateThrottle(UserRateThrottle, SharedRateThrottle):
+    pass
+
+
+class SharedScopedRateThrottle(ScopedRateThrottle, SharedRateThrottle):
+    """Applies the rate named by the view's ``throttle_scope``, if it has one."""
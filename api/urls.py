@@ -1,16 +1,14 @@
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-)
+from drf_spectacular.views import SpectacularSwaggerView
 from rest_framework_simplejwt.views import TokenRefreshView
+from .schema import PrecompiledSchemaView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/users/", include("users.urls"), name="users"),
     path("api/events/", include("events.urls"), name="events"),
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+    path("api/schema/", PrecompiledSchemaView.as_view(), name="schema"),
     path(
         "api/schema/docs/",
         SpectacularSwaggerView.as_view(url_name="schema"),
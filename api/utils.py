@@ -1,10 +1,15 @@
-from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 from decouple import config
+from users.models import OutboxEmail
 
 
 def send_confirmation_email(user, confirmation_url):
+    """
+    Queue the confirmation email in the outbox. Call it inside the signup
+    transaction: the email exists only if the user does, and it is delivered
+    by the ``send_outbox_emails`` worker rather than during the request.
+    """
     subject = "Email Confirmation"
     message = render_to_string(
         "emails/confirmation_email.txt",
@@ -13,4 +18,6 @@ def send_confirmation_email(user, confirmation_url):
     from_email = config("EMAIL_USER")
     to = user.email
 
-    send_mail(subject, message, from_email, [to])
+    return OutboxEmail.objects.create(
+        subject=subject, body=message, from_email=from_email, to=[to]
+    )
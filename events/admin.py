@@ -3,4 +3,8 @@ from .models import *
 
 
 admin.site.register(Category)
-admin.site.register(EventModel)
+
+
+@admin.register(EventModel)
+class EventModelAdmin(admin.ModelAdmin):
+    readonly_fields = ["participant_count"]
@@ -0,0 +1,200 @@
+"""
+Native async versions of the hottest event endpoints, for ASGI deployments.
+
+DRF only dispatches sync views, which ASGI runs in a worker thread per
+request. These are plain Django async views that reuse the sync views'
+filters, pagination, caching and serializers. Only ORM calls leave the
+event loop. They live next to the sync routes under ``async/`` and are
+not part of the OpenAPI schema.
+"""
+
+import math
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from api.query_budget import query_budget
+from users.authentication import aauthenticate
+from .cache import (
+    CATEGORIES,
+    EVENTS,
+    aget_generation,
+    aread_primary_if_changed,
+    get_cache,
+    metrics,
+)
+from .registration import RegistrationError, aregister_participant
+from .serializers import EventDetailSerializer
+from .views import EventDetailView, ListEventView
+
+
+class AsyncAPIView(View):
+    """
+    Base class for async endpoints: JWT authentication, an authenticated
+    user requirement, the default throttles, and DRF-shaped JSON errors.
+    """
+
+    throttle_scope = None
+    requires_user_row = False
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Bearer tokens only, no session cookie: nothing for CSRF to protect.
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            request.user = await aauthenticate(request, self.requires_user_row)
+            if request.user is None:
+                raise exceptions.NotAuthenticated()
+            await self.check_throttles(request)
+            return await super().dispatch(request, *args, **kwargs)
+        except Http404 as exc:
+            return self.handle_exception(exceptions.NotFound(*exc.args))
+        except exceptions.APIException as exc:
+            return self.handle_exception(exc)
+
+    async def check_throttles(self, request):
+        # The shared throttle store is a SQLite file that can wait up to its
+        # busy timeout for a lock, so it is hit off the event loop. Its
+        # connections are per thread, so any worker thread will do.
+        waits = await sync_to_async(self.throttle_waits, thread_sensitive=False)(
+            request
+        )
+        if waits:
+            waits = [wait for wait in waits if wait is not None]
+            raise exceptions.Throttled(max(waits, default=None))
+
+    def throttle_waits(self, request):
+        return [
+            throttle.wait()
+            for throttle in (cls() for cls in api_settings.DEFAULT_THROTTLE_CLASSES)
+            if not throttle.allow_request(request, self)
+        ]
+
+    def handle_exception(self, exc):
+        headers = {}
+        if isinstance(
+            exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+        ):
+            headers["WWW-Authenticate"] = 'Bearer realm="api"'
+        if isinstance(exc, exceptions.Throttled) and exc.wait is not None:
+            headers["Retry-After"] = str(math.ceil(exc.wait))
+        data = (
+            exc.detail
+            if isinstance(exc.detail, (list, dict))
+            else {"detail": exc.detail}
+        )
+        return JsonResponse(data, status=exc.status_code, headers=headers, safe=False)
+
+
+def _set_validators(response, etag, last_modified):
+    if 200 <= response.status_code < 300 or response.status_code == 304:
+        if etag is not None:
+            response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+@query_budget(4)
+class AsyncListEventView(AsyncAPIView):
+    """``ListEventView`` with the same filters, cursors, cache and ETags."""
+
+    async def get(self, request, *args, **kwargs):
+        drf_request = Request(request)
+        drf_request.user = request.user
+        # The sync view builds querysets and cache keys without queries.
+        view = ListEventView(
+            request=drf_request, args=args, kwargs=kwargs, format_kwarg=None
+        )
+        cache = get_cache()
+        generation = await aget_generation(EVENTS)
+        key = view.get_cache_key(drf_request, generation)
+
+        validators = await cache.aget(f"{key}:validators")
+        if validators is None:
+            await aread_primary_if_changed()
+            stats = (
+                await view.filter_queryset(view.get_queryset())
+                .order_by()
+                .aaggregate(**view.validator_stats)
+            )
+            validators = view.make_validators(
+                drf_request, stats, generation, await aget_generation(CATEGORIES)
+            )
+            await cache.aset(
+                f"{key}:validators", validators, settings.RESPONSE_CACHE_TIMEOUT
+            )
+        etag, last_modified = validators
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            data = await cache.aget(key)
+            outcome = "hit" if data is not None else "miss"
+            await metrics.arecord(EVENTS, outcome)
+            if data is None:
+                await aread_primary_if_changed()
+                page = await view.paginator.apaginate_queryset(
+                    view.filter_queryset(view.get_queryset()), drf_request, view
+                )
+                data = view.paginator.get_paginated_response(
+                    view.get_serializer(page, many=True).data
+                ).data
+                await cache.aset(key, data, settings.RESPONSE_CACHE_TIMEOUT)
+            response = JsonResponse(data)
+            response["X-Cache"] = outcome.upper()
+        return _set_validators(response, etag, last_modified)
+
+
+@query_budget(5)
+class AsyncEventDetailView(AsyncAPIView):
+    """``EventDetailView``, including its ETag/Last-Modified handling."""
+
+    async def get(self, request, event_id):
+        row = await EventDetailView.validator_row(event_id).afirst()
+        if row is None:
+            raise Http404("No EventModel matches the given query.")
+        etag, last_modified = EventDetailView.make_validators(event_id, row)
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            try:
+                event = await EventDetailView.queryset.aget(id=event_id)
+            except EventDetailView.queryset.model.DoesNotExist:
+                raise Http404("No EventModel matches the given query.")
+            response = JsonResponse(EventDetailSerializer(event).data)
+        return _set_validators(response, etag, last_modified)
+
+
+@query_budget(6)
+class AsyncEventRegistrationView(AsyncAPIView):
+    """``EventRegistrationView`` on ``aregister_participant``."""
+
+    throttle_scope = "event_registration"
+
+    async def post(self, request, event_id):
+        try:
+            total_participants = await aregister_participant(event_id, request.user)
+        except RegistrationError as e:
+            return JsonResponse({"message": e.message}, status=e.status_code)
+
+        return JsonResponse(
+            {
+                "message": "Event registration successful.",
+                "total_participants": total_participants,
+            }
+        )
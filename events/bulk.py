@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.db import transaction
+
+from .cache import EVENTS, bump_generation
+from .models import Category, EventModel
+from .serializers import EventSerializer
+
+
+def _category_ids(items):
+    ids = set()
+    for item in items:
+        if isinstance(item, dict):
+            try:
+                ids.add(int(item.get("category")))
+            except (TypeError, ValueError):
+                pass
+    return ids
+
+
+def bulk_create_events(items, batch_size=None):
+    """
+    Validate ``items`` and insert the valid ones with ``bulk_create``.
+
+    Every ``category`` reference is resolved up front with a single ``IN``
+    query and handed to the serializers through their context. Invalid items
+    are reported by index and do not stop the rest from being created.
+    Returns ``(created, errors)``.
+    """
+    batch_size = batch_size or settings.EVENT_BULK_CREATE_BATCH_SIZE
+    context = {"categories": Category.objects.in_bulk(_category_ids(items))}
+
+    events, errors = [], []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append(
+                {
+                    "index": index,
+                    "errors": {"non_field_errors": ["Expected an object."]},
+                }
+            )
+            continue
+        serializer = EventSerializer(data=item, context=context)
+        if serializer.is_valid():
+            event = EventModel(**serializer.validated_data)
+            event.set_geo_cell()
+            events.append(event)
+        else:
+            errors.append({"index": index, "errors": serializer.errors})
+
+    if events:
+        with transaction.atomic():
+            # bulk_create sends no post_save, so invalidate cached lists here.
+            events = EventModel.objects.bulk_create(events, batch_size=batch_size)
+            bump_generation(EVENTS)
+    return events, errors
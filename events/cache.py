@@ -0,0 +1,224 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.response import Response
+
+from api.routers import pin_to_primary
+
+EVENTS = "events"
+CATEGORIES = "categories"
+# When a generation was last bumped, in any namespace.
+_CHANGED_AT = "generation:changed_at"
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def _generation_key(namespace):
+    return f"generation:{namespace}"
+
+
+def get_generation(namespace):
+    cache = get_cache()
+    generation = cache.get(_generation_key(namespace))
+    if generation is None:
+        # Seed from the clock so a lost counter never reuses old generations.
+        cache.add(_generation_key(namespace), time.time_ns(), None)
+        generation = cache.get(_generation_key(namespace))
+    return generation
+
+
+async def aget_generation(namespace):
+    cache = get_cache()
+    generation = await cache.aget(_generation_key(namespace))
+    if generation is None:
+        await cache.aadd(_generation_key(namespace), time.time_ns(), None)
+        generation = await cache.aget(_generation_key(namespace))
+    return generation
+
+
+def bump_generation(*namespaces):
+    """
+    Invalidate every cached response in ``namespaces`` once the current
+    transaction commits, so no reader can re-cache pre-commit data under the
+    new generation.
+    """
+
+    def bump():
+        # A fresh value rather than incr, which the file and database
+        # backends implement as get then set: two concurrent bumps could
+        # both land on the same generation and one invalidation be lost.
+        generation = time.time_ns()
+        values = {_generation_key(namespace): generation for namespace in namespaces}
+        get_cache().set_many({**values, _CHANGED_AT: time.time()}, None)
+
+    transaction.on_commit(bump)
+
+
+def _recently_changed(changed_at):
+    return (
+        changed_at is not None
+        and time.time() - changed_at < settings.DATABASE_REPLICA_MAX_LAG
+    )
+
+
+def read_primary_if_changed():
+    """
+    Pin the rest of the request to the primary if a generation was bumped
+    less than ``DATABASE_REPLICA_MAX_LAG`` seconds ago. Call it before
+    filling the cache: a replica may not have the change yet, and whatever
+    is cached now is served until the next change.
+    """
+    if settings.DATABASE_REPLICA_ALIASES and _recently_changed(
+        get_cache().get(_CHANGED_AT)
+    ):
+        pin_to_primary()
+
+
+async def aread_primary_if_changed():
+    if settings.DATABASE_REPLICA_ALIASES and _recently_changed(
+        await get_cache().aget(_CHANGED_AT)
+    ):
+        pin_to_primary()
+
+
+class CacheMetrics:
+    """
+    Hit/miss counters per namespace. Counts are kept in process and added to
+    the shared cache every ``flush_every`` lookups, so all workers report
+    into the same totals without a cache write per request.
+    """
+
+    flush_every = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._seen = 0
+
+    def _count(self, namespace, outcome):
+        with self._lock:
+            self._pending[(namespace, outcome)] += 1
+            self._seen += 1
+            return self._seen >= self.flush_every
+
+    def record(self, namespace, outcome):
+        if self._count(namespace, outcome):
+            self.flush()
+
+    async def arecord(self, namespace, outcome):
+        if self._count(namespace, outcome):
+            await sync_to_async(self.flush)()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending, self._seen = self._pending, Counter(), 0
+        cache = get_cache()
+        for (namespace, outcome), count in pending.items():
+            key = f"metrics:{namespace}:{outcome}"
+            cache.add(key, 0, None)
+            cache.incr(key, count)
+
+    def snapshot(self, namespaces=(EVENTS, CATEGORIES)):
+        self.flush()
+        cache = get_cache()
+        report = {}
+        for namespace in namespaces:
+            hits = cache.get(f"metrics:{namespace}:hit", 0)
+            misses = cache.get(f"metrics:{namespace}:miss", 0)
+            lookups = hits + misses
+            report[namespace] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": round(hits / lookups, 4) if lookups else None,
+            }
+        return report
+
+
+metrics = CacheMetrics()
+
+
+class CachedListMixin:
+    """
+    Cache the serialized body of a list view in the shared response cache.
+
+    Entries are keyed on the namespace generation plus the normalized
+    filter, search, ordering and pagination parameters the view actually
+    understands; anything else in the query string is ignored. Lookups happen
+    after authentication and permission checks have run.
+    """
+
+    cache_namespace = None
+    # Query parameters the view reads itself, beyond its filters and paginator.
+    cache_query_params = ()
+
+    def get_cache_params(self):
+        params = set(self.cache_query_params)
+        for backend in getattr(self, "filter_backends", []):
+            if issubclass(backend, DjangoFilterBackend):
+                params.update(self.filterset_class.base_filters)
+            elif issubclass(backend, SearchFilter):
+                params.add(backend.search_param)
+            elif issubclass(backend, OrderingFilter):
+                params.add(backend.ordering_param)
+        paginator = self.paginator
+        if paginator is not None:
+            for attr in (
+                "cursor_query_param",
+                "page_query_param",
+                "page_size_query_param",
+            ):
+                if getattr(paginator, attr, None):
+                    params.add(getattr(paginator, attr))
+        return params
+
+    def get_cache_fingerprint(self, request):
+        search_param = SearchFilter.search_param
+        parts = []
+        for param in sorted(self.get_cache_params()):
+            values = sorted(
+                value.strip().lower() if param == search_param else value.strip()
+                for value in request.query_params.getlist(param)
+            )
+            values = [value for value in values if value]
+            if values:
+                parts.append(f"{param}={'&'.join(values)}")
+
+        fingerprint = "|".join([request.get_host(), request.path, *parts])
+        return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+    def get_cache_key(self, request, generation=None):
+        fingerprint = self.get_cache_fingerprint(request)
+        if generation is None:
+            generation = get_generation(self.cache_namespace)
+        return f"response:{self.cache_namespace}:{generation}:{fingerprint}"
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        cache = get_cache()
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            metrics.record(self.cache_namespace, "hit")
+            response = Response(data)
+            response["X-Cache"] = "HIT"
+            return response
+
+        metrics.record(self.cache_namespace, "miss")
+        read_primary_if_changed()
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        response["X-Cache"] = "MISS"
+        return response
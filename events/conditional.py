@@ -0,0 +1,41 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    fingerprint = "|".join(str(part) for part in parts)
+    return quote_etag(hashlib.sha256(fingerprint.encode("utf-8")).hexdigest())
+
+
+class ConditionalGetMixin:
+    """
+    Answer ``If-None-Match``/``If-Modified-Since`` with 304 Not Modified
+    before anything is serialized.
+
+    Subclasses implement ``get_validators()`` and return ``(etag,
+    last_modified)``, where ``last_modified`` is a Unix timestamp. Either may
+    be ``None``. The check runs inside the handler, after authentication,
+    permissions and throttling.
+    """
+
+    def get_validators(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request, *args, **kwargs)
+        response = None
+        if etag is not None or last_modified is not None:
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+
+        if 200 <= response.status_code < 300 or response.status_code == 304:
+            if etag is not None:
+                response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
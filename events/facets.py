@@ -0,0 +1,25 @@
+from django.db.models import Count, F
+
+# Facet name -> the column its buckets group on.
+FACETS = {
+    "category": "category__name",
+    "status": "status",
+    "location": "location",
+}
+
+
+def facet_counts(queryset, facets, limit):
+    """
+    Count the rows of ``queryset`` per value of each facet, with one
+    ``GROUP BY`` query per facet that returns at most ``limit`` buckets,
+    largest first.
+    """
+    return {
+        facet: list(
+            queryset.order_by()
+            .values(value=F(FACETS[facet]))
+            .annotate(count=Count("pk"))
+            .order_by("-count", "value")[:limit]
+        )
+        for facet in facets
+    }
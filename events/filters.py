@@ -1,15 +1,170 @@
+import datetime
+
 import django_filters
+from django import forms
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.filters import OrderingFilter
+from .geo import cells_q, haversine_km
 from .models import EventModel
 
 
+class PointField(forms.Field):
+    default_error_messages = {
+        "invalid": "Enter a point as latitude,longitude.",
+        "out_of_range": "Latitude must be within ±90 and longitude within ±180.",
+    }
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            latitude, longitude = (float(part) for part in value.split(","))
+        except ValueError:
+            raise forms.ValidationError(self.error_messages["invalid"], "invalid")
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise forms.ValidationError(
+                self.error_messages["out_of_range"], "out_of_range"
+            )
+        return latitude, longitude
+
+
+class PointFilter(django_filters.Filter):
+    field_class = PointField
+
+
+def _start_of_day(day):
+    # Midnight in the current time zone, so days are the ones users see.
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
 class EventFilter(django_filters.FilterSet):
-    name = django_filters.CharFilter(lookup_expr="icontains")
+    name = django_filters.CharFilter(field_name="event_name", lookup_expr="icontains")
     location = django_filters.CharFilter(lookup_expr="icontains")
-    date = django_filters.DateFilter()
+    date = django_filters.DateFilter(field_name="event_date", method="filter_date")
     category = django_filters.CharFilter(
         field_name="category__name", lookup_expr="icontains"
     )
+    # ``from`` is a keyword, so both range bounds go in through locals().
+    locals()["from"] = django_filters.DateFilter(
+        field_name="event_date",
+        method="filter_from",
+        help_text="Only events on or after this local date.",
+    )
+    locals()["to"] = django_filters.DateFilter(
+        field_name="event_date",
+        method="filter_to",
+        help_text="Only events on or before this local date.",
+    )
+    near = PointFilter(
+        method="filter_near",
+        help_text="latitude,longitude: only events within radius_km of it, "
+        "with their distance_km; order them with ordering=distance_km.",
+    )
+    radius_km = django_filters.NumberFilter(
+        method="filter_radius",
+        min_value=0,
+        max_value=settings.GEO_MAX_RADIUS_KM,
+        help_text="Search radius for near, in kilometres.",
+    )
 
     class Meta:
         model = EventModel
-        fields = ["name", "location", "date", "category"]
+        fields = [
+            "name",
+            "location",
+            "date",
+            "from",
+            "to",
+            "category",
+            "near",
+            "radius_km",
+        ]
+
+    # Dates become half-open ranges on the raw column, which the event_date
+    # indexes can serve; __date would wrap every row in a conversion function.
+    def filter_date(self, queryset, name, value):
+        return self.filter_to(self.filter_from(queryset, name, value), name, value)
+
+    def filter_from(self, queryset, name, value):
+        return queryset.filter(**{f"{name}__gte": _start_of_day(value)})
+
+    def filter_to(self, queryset, name, value):
+        next_day = value + datetime.timedelta(days=1)
+        return queryset.filter(**{f"{name}__lt": _start_of_day(next_day)})
+
+    def filter_near(self, queryset, name, value):
+        # The indexed grid cells narrow the search to the circle's bounding
+        # box; the exact distance is only computed for the rows in there.
+        latitude, longitude = value
+        radius = self.form.cleaned_data.get("radius_km")
+        radius = settings.GEO_DEFAULT_RADIUS_KM if radius is None else float(radius)
+        return (
+            queryset.filter(cells_q(latitude, longitude, radius))
+            .annotate(distance_km=haversine_km(latitude, longitude))
+            .filter(distance_km__lte=radius)
+        )
+
+    def filter_radius(self, queryset, name, value):
+        # Read by filter_near.
+        return queryset
+
+
+class EventOrderingFilter(OrderingFilter):
+    """``OrderingFilter`` that also offers ``distance_km`` once ``near`` set it."""
+
+    annotated_fields = ["distance_km"]
+
+    def get_valid_fields(self, queryset, view, context={}):
+        return [
+            (field, label)
+            for field, label in super().get_valid_fields(queryset, view, context)
+            if field not in self.annotated_fields or field in queryset.query.annotations
+        ]
+
+
+class CalendarForm(forms.Form):
+    def clean(self):
+        cleaned_data = super().clean()
+        start, end = cleaned_data.get("from"), cleaned_data.get("to")
+        if start and end:
+            if start > end:
+                raise forms.ValidationError("from must not be after to.")
+            if (end - start).days >= settings.EVENT_CALENDAR_MAX_DAYS:
+                raise forms.ValidationError(
+                    f"The range may span at most {settings.EVENT_CALENDAR_MAX_DAYS} days."
+                )
+        return cleaned_data
+
+
+class EventCalendarFilter(EventFilter):
+    """``EventFilter`` with a required, bounded from/to range and a period."""
+
+    PERIODS = [("day", "day"), ("month", "month")]
+
+    locals()["from"] = django_filters.DateFilter(
+        field_name="event_date",
+        method="filter_from",
+        required=True,
+        help_text="First local date counted.",
+    )
+    locals()["to"] = django_filters.DateFilter(
+        field_name="event_date",
+        method="filter_to",
+        required=True,
+        help_text="Last local date counted.",
+    )
+    period = django_filters.ChoiceFilter(
+        choices=PERIODS,
+        method="filter_period",
+        empty_label=None,
+        help_text="Count events per local day (the default) or month.",
+    )
+
+    class Meta(EventFilter.Meta):
+        form = CalendarForm
+        fields = EventFilter.Meta.fields + ["period"]
+
+    def filter_period(self, queryset, name, value):
+        # Read by EventCalendarView.
+        return queryset
@@ -0,0 +1,95 @@
+import math
+
+from django.conf import settings
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def _grid():
+    size = settings.GEO_CELL_DEGREES
+    return size, math.ceil(180 / size), math.ceil(360 / size)
+
+
+def _row(latitude, size, rows):
+    return min(max(int((latitude + 90) // size), 0), rows - 1)
+
+
+def _column(longitude, size, columns):
+    return int((longitude + 180) // size) % columns
+
+
+def grid_cell(latitude, longitude):
+    """
+    The id of the GEO_CELL_DEGREES square containing a point, numbered row
+    by row from the south-west corner, so the cells of one row of the grid
+    form a single contiguous range of ids.
+    """
+    if latitude is None or longitude is None:
+        return None
+    size, rows, columns = _grid()
+    return _row(latitude, size, rows) * columns + _column(longitude, size, columns)
+
+
+def covering_cells(latitude, longitude, radius_km):
+    """
+    Return ``(first, last)`` cell id ranges that together cover every point
+    within ``radius_km`` of the given one: one range per grid row touched
+    by the circle's bounding box, two where it crosses the antimeridian,
+    and runs of whole rows merged into one.
+    """
+    size, rows, columns = _grid()
+    degrees = radius_km / KM_PER_DEGREE
+    south = _row(latitude - degrees, size, rows)
+    north = _row(latitude + degrees, size, rows)
+
+    # Longitude degrees shrink towards the poles; size the box for the
+    # widest latitude it reaches.
+    widest = abs(latitude) + degrees
+    span = degrees / math.cos(math.radians(widest)) if widest < 90 else 180
+    if span >= 180:
+        return [(south * columns, north * columns + columns - 1)]
+
+    west = _column(longitude - span, size, columns)
+    east = _column(longitude + span, size, columns)
+    if west <= east:
+        spans = [(west, east)]
+    else:
+        spans = [(west, columns - 1), (0, east)]
+
+    return [
+        (row * columns + first, row * columns + last)
+        for row in range(south, north + 1)
+        for first, last in spans
+    ]
+
+
+def cells_q(latitude, longitude, radius_km, field="geo_cell"):
+    condition = Q()
+    for first, last in covering_cells(latitude, longitude, radius_km):
+        if first == last:
+            condition |= Q(**{field: first})
+        else:
+            condition |= Q(**{f"{field}__range": (first, last)})
+    return condition
+
+
+def haversine_km(latitude, longitude, lat_field="latitude", lon_field="longitude"):
+    """
+    Great-circle distance in kilometres from a point to each row, as a
+    query expression (SQLite gets the trigonometry from Django's Python
+    functions, so no spatial extension is needed).
+    """
+    lat = Value(latitude, output_field=FloatField())
+    lon = Value(longitude, output_field=FloatField())
+    half_dlat = Radians(F(lat_field) - lat) / 2
+    half_dlon = Radians(F(lon_field) - lon) / 2
+    a = Power(Sin(half_dlat), 2) + Value(math.cos(math.radians(latitude))) * Cos(
+        Radians(F(lat_field))
+    ) * Power(Sin(half_dlon), 2)
+    # Rounding can push ``a`` a hair above 1, outside asin's domain.
+    return Value(2 * EARTH_RADIUS_KM) * ASin(
+        Least(Sqrt(a), Value(1.0)), output_field=FloatField()
+    )
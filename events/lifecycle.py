@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import EVENTS, bump_generation
+from .models import EventModel
+
+
+def _advance(statuses, due, new_status, now, batch_size):
+    moved = 0
+    while True:
+        # The (status, event_date) index serves this scan, so each batch
+        # reads only rows that are due however large the table is.
+        ids = list(
+            EventModel.objects.filter(status__in=statuses, event_date__lte=due)
+            .order_by("status", "event_date")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            return moved
+        with transaction.atomic():
+            # Re-check the status so rows changed since the scan are left alone.
+            moved += EventModel.objects.filter(pk__in=ids, status__in=statuses).update(
+                status=new_status, updated_at=now
+            )
+        if len(ids) < batch_size:
+            return moved
+
+
+def advance_event_statuses(now=None, batch_size=None):
+    """
+    Move started events from UPCOMING to ONGOING, and events older than
+    ``EVENT_ONGOING_DURATION`` to COMPLETED, with one set-based UPDATE per
+    batch of at most ``batch_size`` rows. CANCELED events are never touched.
+
+    Returns ``{"ongoing": n, "completed": n}``.
+    """
+    now = now or timezone.now()
+    batch_size = batch_size or settings.EVENT_STATUS_BATCH_SIZE
+    finished = now - settings.EVENT_ONGOING_DURATION
+
+    # Complete first so events that were never seen ONGOING skip straight on.
+    completed = _advance(
+        [EventModel.UPCOMING, EventModel.ONGOING],
+        finished,
+        EventModel.COMPLETED,
+        now,
+        batch_size,
+    )
+    ongoing = _advance([EventModel.UPCOMING], now, EventModel.ONGOING, now, batch_size)
+
+    if completed or ongoing:
+        bump_generation(EVENTS)
+    return {"ongoing": ongoing, "completed": completed}
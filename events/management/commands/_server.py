@@ -0,0 +1,74 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import CommandError
+
+
+class ServerProcess:
+    """
+    Run ``python -m <argv>`` (gunicorn, uvicorn, ...) from the project root
+    with extra environment variables for the duration of a ``with`` block,
+    which yields the base URL once the port accepts connections.
+    """
+
+    def __init__(self, argv, port, env=None, startup_timeout=30):
+        self.argv, self.port, self.env = argv, port, env or {}
+        self.startup_timeout = startup_timeout
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", *self.argv],
+            cwd=settings.BASE_DIR,
+            env=dict(os.environ, **self.env),
+        )
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise CommandError(f"{self.argv[0]} exited during startup")
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=1).close()
+                return f"http://127.0.0.1:{self.port}"
+            except OSError:
+                time.sleep(0.2)
+        self.process.kill()
+        raise CommandError(
+            f"{self.argv[0]} did not start listening within {self.startup_timeout}s"
+        )
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        self.process.wait()
+
+
+def gunicorn(workers, port, env=None):
+    return ServerProcess(
+        [
+            "gunicorn",
+            "api.wsgi",
+            f"--workers={workers}",
+            f"--bind=127.0.0.1:{port}",
+            "--log-level=warning",
+        ],
+        port,
+        env,
+    )
+
+
+def uvicorn(workers, port, env=None):
+    return ServerProcess(
+        [
+            "uvicorn",
+            "api.asgi:application",
+            f"--workers={workers}",
+            "--host=127.0.0.1",
+            f"--port={port}",
+            "--log-level=warning",
+            "--no-access-log",
+        ],
+        port,
+        env,
+    )
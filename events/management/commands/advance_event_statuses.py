@@ -0,0 +1,49 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+from events.lifecycle import advance_event_statuses
+
+
+class Command(BaseCommand):
+    help = (
+        "Advance event statuses (UPCOMING -> ONGOING -> COMPLETED) once, or "
+        "keep doing so every --interval seconds with --loop"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop", action="store_true", help="Keep running until interrupted"
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=settings.EVENT_STATUS_INTERVAL,
+            help="Seconds between runs with --loop",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.EVENT_STATUS_BATCH_SIZE,
+            help="Rows changed per UPDATE",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            started = time.perf_counter()
+            moved = advance_event_statuses(batch_size=options["batch_size"])
+            elapsed = (time.perf_counter() - started) * 1000
+            self.stdout.write(
+                f"{timezone.now().isoformat(timespec='seconds')} "
+                f"ongoing={moved['ongoing']} completed={moved['completed']} "
+                f"({elapsed:.1f} ms)"
+            )
+            if not options["loop"]:
+                return
+            try:
+                time.sleep(options["interval"])
+            except KeyboardInterrupt:
+                return
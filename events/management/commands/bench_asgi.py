@@ -0,0 +1,208 @@
+import asyncio
+import json
+import statistics
+import time
+from collections import Counter
+from urllib.parse import urlencode, urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from users.models import ApiKey
+
+from ._server import gunicorn, uvicorn
+from .loadtest import Command as LoadTest
+
+# (server, route names): the sync routes under gunicorn and uvicorn, and the
+# native async routes under uvicorn.
+MODES = {
+    "gunicorn-sync": (gunicorn, ("list-event", "event-detail", "register-event")),
+    "uvicorn-sync": (uvicorn, ("list-event", "event-detail", "register-event")),
+    "uvicorn-async": (
+        uvicorn,
+        ("async-list-event", "async-event-detail", "async-register-event"),
+    ),
+}
+SCENARIOS = ("list", "detail", "register")
+
+
+async def _request(reader, writer, method, path, authorization, slow):
+    head = (
+        f"{method} {path} HTTP/1.1\r\n"
+        "Host: localhost\r\n"
+        f"Authorization: {authorization}\r\n"
+        "Content-Length: 0\r\n\r\n"
+    ).encode("latin-1")
+    if slow:
+        # A slow client: the server gets half the request, then waits.
+        writer.write(head[: len(head) // 2])
+        await writer.drain()
+        await asyncio.sleep(slow)
+        head = head[len(head) // 2 :]
+    writer.write(head)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    elif headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if not size:
+                break
+    return status, headers.get("connection", "").lower() != "close"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the native async event routes under uvicorn with the sync "
+        "routes under gunicorn (and uvicorn) at high concurrency with slow "
+        "clients"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--modes", default=",".join(MODES))
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--concurrency", type=int, default=200)
+        parser.add_argument("--requests", type=int, default=2000, help="Per scenario")
+        parser.add_argument(
+            "--slow-ms",
+            type=int,
+            default=100,
+            help="How long each client stalls halfway through sending a request",
+        )
+        parser.add_argument("--events", type=int, default=10_000)
+        parser.add_argument("--port", type=int, default=8766)
+        parser.add_argument("--output", help="Write the results as JSON")
+
+    def handle(self, *args, **options):
+        modes = options["modes"].split(",")
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f"Unknown modes: {', '.join(sorted(unknown))}")
+
+        # Servers run with throttling off and the production database
+        # profile, so SQLite write locking is not what gets measured.
+        env = {"THROTTLE_ENABLED": "False", "DATABASE_PROFILE": "production"}
+        results = {}
+        for mode in modes:
+            server, routes = MODES[mode]
+            # A fresh storm event per mode, with a seat per registration.
+            ctx = LoadTest().seed(
+                {
+                    "events": options["events"],
+                    "users": max(options["requests"], 500),
+                    "requests": options["requests"],
+                    "concurrency": options["concurrency"],
+                    "storm_capacity": options["requests"],
+                }
+            )
+            with server(options["workers"], options["port"], env) as url:
+                results[mode] = {
+                    scenario: asyncio.run(
+                        self.drive(url, self.builder(scenario, routes, ctx), options)
+                    )
+                    for scenario in SCENARIOS
+                }
+            ApiKey.objects.filter(pk=ctx["api_key_id"]).delete()
+            for scenario, result in results[mode].items():
+                self.stdout.write(
+                    f"{mode:<14} {scenario:<9} {result['throughput_rps']:>8.1f} req/s  "
+                    f"p50 {result['p50_ms']:>8.2f}  p95 {result['p95_ms']:>8.2f}  "
+                    f"p99 {result['p99_ms']:>8.2f} ms  {result['errors']} errors  "
+                    f"{result['statuses']}"
+                )
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(
+                    {
+                        "workers": options["workers"],
+                        "concurrency": options["concurrency"],
+                        "slow_ms": options["slow_ms"],
+                        "modes": results,
+                    },
+                    fh,
+                    indent=2,
+                )
+
+    def builder(self, scenario, routes, ctx):
+        list_route, detail_route, register_route = routes
+
+        def build(i):
+            token = ctx["tokens"][i % len(ctx["tokens"])]
+            if scenario == "list":
+                params = urlencode(ctx["list_params"][i % len(ctx["list_params"])])
+                return "GET", f"{reverse(list_route)}?{params}", token
+            if scenario == "detail":
+                event_id = ctx["event_ids"][i % len(ctx["event_ids"])]
+                return "GET", reverse(detail_route, args=[event_id]), token
+            # Every registration is a different resident taking a seat.
+            return (
+                "POST",
+                reverse(register_route, args=[ctx["storm_event_id"]]),
+                ctx["storm_tokens"][i % len(ctx["storm_tokens"])],
+            )
+
+        return build
+
+    async def drive(self, url, build, options):
+        parts = urlsplit(url)
+        slow = options["slow_ms"] / 1000
+        indexes = iter(range(options["requests"]))
+        latencies, statuses = [], Counter()
+
+        async def client():
+            reader = writer = None
+            for i in indexes:
+                method, path, token = build(i)
+                started = time.perf_counter()
+                try:
+                    if writer is None:
+                        reader, writer = await asyncio.open_connection(
+                            parts.hostname, parts.port
+                        )
+                    status, keep_alive = await _request(
+                        reader, writer, method, path, f"Bearer {token}", slow
+                    )
+                except (
+                    OSError,
+                    ValueError,
+                    IndexError,
+                    asyncio.IncompleteReadError,
+                ) as exc:
+                    status, keep_alive = type(exc).__name__, False
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[status] += 1
+                if not keep_alive and writer is not None:
+                    writer.close()
+                    reader = writer = None
+            if writer is not None:
+                writer.close()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(options["concurrency"])))
+        wall = time.perf_counter() - started
+
+        cuts = statistics.quantiles(latencies, n=100)
+        return {
+            "requests": len(latencies),
+            "errors": sum(
+                count for status, count in statuses.items() if status not in (200, 304)
+            ),
+            "statuses": {
+                str(status): count
+                for status, count in sorted(statuses.items(), key=str)
+            },
+            "throughput_rps": round(len(latencies) / wall, 1),
+            "p50_ms": round(cuts[49], 3),
+            "p95_ms": round(cuts[94], 3),
+            "p99_ms": round(cuts[98], 3),
+        }
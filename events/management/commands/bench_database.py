@@ -0,0 +1,62 @@
+import json
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from ._server import gunicorn
+
+SCENARIOS = {"reads": "event_list", "writes": "registration_storm"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare event list read throughput and registration write throughput "
+        "of each DATABASE_PROFILE under concurrent gunicorn workers"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profiles", default="development,production")
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--events", type=int, default=10_000)
+        parser.add_argument("--port", type=int, default=8765)
+
+    def handle(self, *args, **options):
+        # Every registration must be a real write, so the storm gets a seat
+        # and a distinct resident per request.
+        users = max(options["requests"], 500)
+        results = {}
+        for profile in options["profiles"].split(","):
+            with self.server(profile, options) as url:
+                with tempfile.NamedTemporaryFile(suffix=".json") as report:
+                    call_command(
+                        "loadtest",
+                        url=url,
+                        scenarios=",".join(SCENARIOS.values()),
+                        requests=options["requests"],
+                        concurrency=options["concurrency"],
+                        events=options["events"],
+                        users=users,
+                        storm_capacity=options["requests"],
+                        output=report.name,
+                        stdout=self.stdout,
+                    )
+                    results[profile] = json.load(report)["scenarios"]
+
+        self.stdout.write("")
+        for label, scenario in SCENARIOS.items():
+            for profile, scenarios in results.items():
+                result = scenarios[scenario]
+                self.stdout.write(
+                    f"{label:<7} {profile:<12} {result['throughput_rps']:>8.1f} req/s  "
+                    f"p95 {result['p95_ms']:>8.2f} ms  {result['errors']} errors"
+                )
+
+    def server(self, profile, options):
+        return gunicorn(
+            options["workers"],
+            options["port"],
+            {"DATABASE_PROFILE": profile, "THROTTLE_ENABLED": "False"},
+        )
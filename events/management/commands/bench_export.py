@@ -0,0 +1,124 @@
+import resource
+import subprocess
+import sys
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from events.models import Category, EventModel
+from events.views import EventExportView
+from users.models import CustomUser
+
+
+def peak_rss_mb():
+    # Linux carries ru_maxrss over fork and exec, so a child would report
+    # its parent's peak; VmHWM belongs to the running program alone.
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is reported in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed events and measure throughput and peak RSS of the streaming "
+        "event export"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=1_000_000)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--output", choices=["ndjson", "csv"], default="ndjson")
+        parser.add_argument(
+            "--keep", action="store_true", help="Keep the generated events"
+        )
+        parser.add_argument(
+            "--category",
+            type=int,
+            help="Only export the events of this category, already seeded, "
+            "in this process",
+        )
+
+    def handle(self, *args, **options):
+        if options["category"]:
+            self.export(Category.objects.get(pk=options["category"]), options)
+            return
+
+        tag = uuid.uuid4().hex[:8]
+        category = Category.objects.create(name=f"Export benchmark {tag}")
+        try:
+            self.seed(category, options["events"], options["batch_size"])
+            # ru_maxrss is a high-water mark, and seeding may peak higher than
+            # the export, so the export is measured in a fresh process.
+            child = subprocess.run(
+                [
+                    sys.executable,
+                    "manage.py",
+                    "bench_export",
+                    f"--category={category.pk}",
+                    f"--output={options['output']}",
+                ],
+                cwd=settings.BASE_DIR,
+            )
+            if child.returncode:
+                raise CommandError("The export run failed")
+        finally:
+            if not options["keep"]:
+                # Deleting the category cascades to its events.
+                category.delete()
+
+    def export(self, category, options):
+        baseline = peak_rss_mb()
+
+        admin = CustomUser(
+            email="bench-export@example.invalid", is_government_authority=True
+        )
+        request = APIRequestFactory().get(
+            "/api/events/export/",
+            {"output": options["output"], "category": category.name},
+        )
+        force_authenticate(request, user=admin)
+        view = EventExportView.as_view(permission_classes=[])
+
+        started = time.perf_counter()
+        response = view(request)
+        rows, size = -1 if options["output"] == "csv" else 0, 0
+        for chunk in response.streaming_content:
+            size += len(chunk)
+            rows += chunk.count(b"\n")
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(f"Rows exported:  {rows}")
+        self.stdout.write(f"Bytes:          {size / 1024 / 1024:.1f} MB")
+        self.stdout.write(
+            f"Elapsed:        {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s)"
+        )
+        self.stdout.write(f"Peak RSS:       {baseline:.1f} MB before export")
+        self.stdout.write(f"                {peak_rss_mb():.1f} MB after export")
+
+    def seed(self, category, total, batch_size):
+        now = timezone.now()
+        for start in range(0, total, batch_size):
+            EventModel.objects.bulk_create(
+                EventModel(
+                    event_name=f"Export benchmark {index}",
+                    event_hosts="bench_export",
+                    description="Generated by the bench_export command",
+                    image_url="https://example.com/export.jpg",
+                    event_date=now + timedelta(minutes=index),
+                    registration_deadline=now + timedelta(minutes=index),
+                    category=category,
+                    location=f"Venue {index % 100}",
+                    capacity=100,
+                )
+                for index in range(start, min(start + batch_size, total))
+            )
@@ -0,0 +1,55 @@
+import gzip
+import io
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI schema into SCHEMA_FILE with precompressed "
+        "gzip/brotli variants, served as-is at /api/schema/"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Fail if SCHEMA_FILE is not up to date instead of writing it",
+        )
+
+    def handle(self, *args, **options):
+        path = str(settings.SCHEMA_FILE)
+        out = io.StringIO()
+        call_command("spectacular", stdout=out, fail_on_warn=False)
+        schema = out.getvalue().encode("utf-8")
+
+        if options["check"]:
+            try:
+                with open(path, "rb") as fh:
+                    current = fh.read()
+            except FileNotFoundError:
+                current = None
+            if current != schema:
+                raise CommandError(f"{path} is out of date; run build_schema")
+            self.stdout.write(self.style.SUCCESS(f"{path} is up to date"))
+            return
+
+        variants = {
+            path: schema,
+            # mtime=0 keeps the output identical between builds.
+            path + ".gz": gzip.compress(schema, compresslevel=9, mtime=0),
+        }
+        if brotli is not None:
+            variants[path + ".br"] = brotli.compress(schema, quality=11)
+
+        for target, body in variants.items():
+            with open(target, "wb") as fh:
+                fh.write(body)
+            self.stdout.write(f"{target}: {len(body):,} bytes")
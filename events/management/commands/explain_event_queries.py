@@ -0,0 +1,212 @@
+import json
+import statistics
+import time
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from events.models import Category, EventModel
+from events.views import ListEventView
+
+BENCHMARK_CATEGORY = "Query Plan Benchmark"
+
+FILTERS = {
+    "none": {},
+    "name": {"name": "Event 42"},
+    "location": {"location": "Venue 7"},
+    "date": {"date": None},  # filled in with a seeded date
+    "category": {"category": BENCHMARK_CATEGORY},
+    "search": {"search": "Venue 7"},
+}
+
+ORDERINGS = [
+    "event_date",
+    "-event_date",
+    "event_name",
+    "-event_name",
+    "location",
+    "-location",
+    "category__name",
+    "-category__name",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed events, run every supported event list filter/ordering "
+        "combination and record EXPLAIN QUERY PLAN output with timings"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--events",
+            type=int,
+            default=100_000,
+            help="Make sure at least this many benchmark events exist",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--output", help="Write the JSON report to this file")
+        parser.add_argument(
+            "--baseline",
+            help="Earlier JSON report; fail if a case now scans the table or "
+            "sorts in a temp b-tree where it did not before",
+        )
+        parser.add_argument(
+            "--cleanup", action="store_true", help="Delete the benchmark events"
+        )
+
+    def handle(self, *args, **options):
+        if options["cleanup"]:
+            deleted, _ = Category.objects.filter(name=BENCHMARK_CATEGORY).delete()
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} row(s)"))
+            return
+
+        category = self.seed(options["events"])
+        first_event = EventModel.objects.filter(category=category).earliest("id")
+        FILTERS["date"]["date"] = timezone.localdate(first_event.event_date).isoformat()
+
+        cases = []
+        for filter_name, params in FILTERS.items():
+            for ordering in ORDERINGS:
+                first_page = self.run_case(
+                    dict(params, ordering=ordering), options["repeat"]
+                )
+                cases.append(
+                    dict(
+                        first_page["result"],
+                        filter=filter_name,
+                        ordering=ordering,
+                        page="first",
+                    )
+                )
+                if first_page["next"]:
+                    cursor = parse_qs(urlparse(first_page["next"]).query)["cursor"][0]
+                    seek = self.run_case(
+                        dict(params, ordering=ordering, cursor=cursor),
+                        options["repeat"],
+                    )
+                    cases.append(
+                        dict(
+                            seek["result"],
+                            filter=filter_name,
+                            ordering=ordering,
+                            page="seek",
+                        )
+                    )
+
+        report = {
+            "vendor": connection.vendor,
+            "events": EventModel.objects.count(),
+            "cases": cases,
+        }
+        for case in cases:
+            flags = [flag for flag in ("full_scan", "temp_sort") if case[flag]]
+            self.stdout.write(
+                f"{case['filter']:<9} {case['ordering']:<16} {case['page']:<6}"
+                f"{case['median_ms']:>9.2f} ms  {', '.join(flags)}"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
+
+        if options["baseline"]:
+            self.compare(report, options["baseline"])
+
+    def seed(self, total, batch_size=5000):
+        category, _ = Category.objects.get_or_create(name=BENCHMARK_CATEGORY)
+        existing = EventModel.objects.filter(category=category).count()
+        now = timezone.now()
+        statuses = list(EventModel.STATUS_CHOICES)
+        for start in range(existing, total, batch_size):
+            EventModel.objects.bulk_create(
+                EventModel(
+                    event_name=f"Event {index}",
+                    event_hosts="explain_event_queries",
+                    description="Generated by the explain_event_queries command",
+                    image_url="https://example.com/event.jpg",
+                    event_date=now + timedelta(minutes=37 * index),
+                    registration_deadline=now + timedelta(minutes=37 * index),
+                    category=category,
+                    location=f"Venue {index % 100}",
+                    capacity=100,
+                    status=statuses[index % len(statuses)],
+                )
+                for index in range(start, min(start + batch_size, total))
+            )
+        if existing < total:
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+        return category
+
+    def run_case(self, params, repeat):
+        """
+        Run the list view's real filter + pagination path and capture the
+        page query it issues.
+        """
+        timings = []
+        for _ in range(repeat):
+            view = ListEventView()
+            request = Request(
+                APIRequestFactory().get(
+                    "/api/events/event-list/", params, HTTP_HOST="localhost"
+                )
+            )
+            view.setup(request)
+            view.request, view.format_kwarg = request, None
+            queryset = view.filter_queryset(view.get_queryset())
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                view.paginate_queryset(queryset)
+                timings.append((time.perf_counter() - started) * 1000)
+
+        sql = captured.captured_queries[-1]["sql"]
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}")
+            plan = [
+                " ".join(str(column) for column in row) for row in cursor.fetchall()
+            ]
+
+        table = EventModel._meta.db_table
+        return {
+            "next": view.paginator.get_next_link(),
+            "result": {
+                "sql": sql,
+                "plan": plan,
+                "full_scan": any(
+                    (f"SCAN {table}" in line and "USING" not in line)
+                    or f"Seq Scan on {table}" in line
+                    for line in plan
+                ),
+                "temp_sort": any("TEMP B-TREE FOR ORDER BY" in line for line in plan),
+                "median_ms": round(statistics.median(timings), 3),
+            },
+        }
+
+    def compare(self, report, baseline_path):
+        with open(baseline_path) as fh:
+            baseline = {
+                (case["filter"], case["ordering"], case["page"]): case
+                for case in json.load(fh)["cases"]
+            }
+
+        regressions = []
+        for case in report["cases"]:
+            before = baseline.get((case["filter"], case["ordering"], case["page"]))
+            if before is None:
+                continue
+            for flag in ("full_scan", "temp_sort"):
+                if case[flag] and not before[flag]:
+                    regressions.append(
+                        f"{case['filter']} / {case['ordering']} / {case['page']}: {flag}"
+                    )
+
+        if regressions:
+            raise CommandError("Query plan regressions:\n" + "\n".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No query plan regressions"))
@@ -0,0 +1,713 @@
+import http.client
+import itertools
+import json
+import statistics
+import subprocess
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import timedelta
+from urllib.parse import urlencode, urlsplit
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from events.models import Category, EventModel
+from users.models import ApiKey, CustomUser
+from users.roles import GOVERNMENT_AUTHORITY
+from users.tokens import RoleRefreshToken
+
+LOADTEST_CATEGORY = "Load Test"
+EMAIL_PREFIX = "loadtest-"
+PASSWORD = "loadtest-password"
+
+LIST_PARAMS = [
+    {},
+    {"ordering": "-event_date"},
+    {"name": "Event 1"},
+    {"location": "Venue 7"},
+    {"category": LOADTEST_CATEGORY},
+    {"search": "venue 3"},
+    {"ordering": "event_name", "page_size": 50},
+    {"date": None},  # filled in with a seeded date
+]
+
+# "from" is filled in with the first seeded date.
+CALENDAR_PARAMS = [
+    {"days": 30},
+    {"days": 365, "period": "month"},
+    {"days": 90, "location": "Venue 7"},
+]
+
+FACET_PARAMS = [
+    {},
+    {"search": "venue 3"},
+    {"facets": "location", "facet_limit": 5},
+    {"category": LOADTEST_CATEGORY, "facets": "status"},
+]
+
+
+class Scenario:
+    """
+    One route under load. ``build(ctx, i)`` returns the path, JSON body and
+    ``Authorization`` value of the i-th request; statuses outside
+    ``expected`` count as errors.
+    """
+
+    def __init__(self, name, method, build, expected=(200,)):
+        self.name, self.method, self.build, self.expected = (
+            name,
+            method,
+            build,
+            expected,
+        )
+
+
+def _bearer(token):
+    return f"Bearer {token}"
+
+
+def _new_user(ctx, kind, i):
+    return {
+        "email": f"{EMAIL_PREFIX}{ctx['run']}-{kind}-{i}@example.invalid",
+        "password": PASSWORD,
+        "first_name": "Load",
+        "last_name": "Test",
+    }
+
+
+def _doomed_category(ctx, i):
+    # Made while the request is built, which is not timed.
+    return Category.objects.create(name=f"{LOADTEST_CATEGORY} {ctx['run']}-doomed-{i}")
+
+
+# Every route in api/urls.py, events/urls.py and users/urls.py except the
+# Django admin site (admin/), which is not part of the API.
+SCENARIOS = [
+    Scenario("schema", "GET", lambda ctx, i: (reverse("schema"), None, None)),
+    Scenario("swagger_ui", "GET", lambda ctx, i: (reverse("swagger-ui"), None, None)),
+    Scenario(
+        "categories",
+        "GET",
+        lambda ctx, i: (reverse("list-categories"), None, _bearer(ctx["gov_token"])),
+    ),
+    Scenario(
+        "category_create",
+        "POST",
+        lambda ctx, i: (
+            reverse("create-categories"),
+            {"name": f"{LOADTEST_CATEGORY} {ctx['run']}-{i}"},
+            _bearer(ctx["gov_token"]),
+        ),
+        expected=(201,),
+    ),
+    Scenario(
+        "category_delete",
+        "DELETE",
+        lambda ctx, i: (
+            reverse("delete-category", args=[_doomed_category(ctx, i).pk]),
+            None,
+            _bearer(ctx["gov_token"]),
+        ),
+        expected=(204,),
+    ),
+    Scenario(
+        "event_list",
+        "GET",
+        lambda ctx, i: (
+            reverse("list-event") + "?" + urlencode(ctx["list_params"][i % 8]),
+            None,
+            _bearer(ctx["tokens"][i % len(ctx["tokens"])]),
+        ),
+    ),
+    Scenario(
+        "event_detail",
+        "GET",
+        lambda ctx, i: (
+            reverse("event-detail", args=[ctx["event_ids"][i % len(ctx["event_ids"])]]),
+            None,
+            _bearer(ctx["tokens"][i % len(ctx["tokens"])]),
+        ),
+    ),
+    Scenario(
+        "event_calendar",
+        "GET",
+        lambda ctx, i: (
+            reverse("event-calendar")
+            + "?"
+            + urlencode(ctx["calendar_params"][i % len(ctx["calendar_params"])]),
+            None,
+            _bearer(ctx["tokens"][i % len(ctx["tokens"])]),
+        ),
+    ),
+    Scenario(
+        "event_facets",
+        "GET",
+        lambda ctx, i: (
+            reverse("event-facets") + "?" + urlencode(FACET_PARAMS[i % 4]),
+            None,
+            _bearer(ctx["tokens"][i % len(ctx["tokens"])]),
+        ),
+    ),
+    Scenario(
+        "async_event_list",
+        "GET",
+        lambda ctx, i: (
+            reverse("async-list-event") + "?" + urlencode(ctx["list_params"][i % 8]),
+            None,
+            _bearer(ctx["tokens"][i % len(ctx["tokens"])]),
+        ),
+    ),
+    Scenario(
+        "async_event_detail",
+        "GET",
+        lambda ctx, i: (
+            reverse(
+                "async-event-detail",
+                args=[ctx["event_ids"][i % len(ctx["event_ids"])]],
+            ),
+            None,
+            _bearer(ctx["tokens"][i % len(ctx["tokens"])]),
+        ),
+    ),
+    Scenario(
+        "registration_storm",
+        "POST",
+        # Every request is a different resident racing for the same seats.
+        lambda ctx, i: (
+            reverse("register-event", args=[ctx["storm_event_id"]]),
+            {},
+            _bearer(ctx["storm_tokens"][i % len(ctx["storm_tokens"])]),
+        ),
+        expected=(200, 400, 405),
+    ),
+    Scenario(
+        "async_registration_storm",
+        "POST",
+        lambda ctx, i: (
+            reverse("async-register-event", args=[ctx["async_storm_event_id"]]),
+            {},
+            _bearer(ctx["storm_tokens"][i % len(ctx["storm_tokens"])]),
+        ),
+        expected=(200, 400, 405),
+    ),
+    Scenario(
+        "login",
+        "POST",
+        lambda ctx, i: (
+            reverse("login"),
+            {
+                "email": ctx["residents"][i % len(ctx["residents"])],
+                "password": PASSWORD,
+            },
+            None,
+        ),
+    ),
+    Scenario(
+        "logout",
+        "POST",
+        lambda ctx, i: (
+            reverse("logout"),
+            {},
+            _bearer(ctx["tokens"][i % len(ctx["tokens"])]),
+        ),
+    ),
+    Scenario(
+        "admin_login",
+        "POST",
+        lambda ctx, i: (
+            reverse("admin-login"),
+            {"email": ctx["gov_email"], "password": PASSWORD},
+            None,
+        ),
+    ),
+    Scenario(
+        "admin_logout",
+        "POST",
+        # Each request blacklists a refresh token of its own, minted untimed.
+        lambda ctx, i: (
+            reverse("admin-logout"),
+            {"refresh_token": str(RoleRefreshToken.for_user(ctx["gov"]))},
+            _bearer(ctx["gov_token"]),
+        ),
+    ),
+    Scenario(
+        "token_refresh",
+        "POST",
+        lambda ctx, i: (
+            reverse("token_refresh"),
+            {"refresh": ctx["gov_refresh"]},
+            None,
+        ),
+    ),
+    Scenario(
+        "user_profile",
+        "GET",
+        lambda ctx, i: (
+            reverse("user-profile"),
+            None,
+            _bearer(ctx["tokens"][i % len(ctx["tokens"])]),
+        ),
+    ),
+    Scenario(
+        "signup",
+        "POST",
+        lambda ctx, i: (reverse("register"), _new_user(ctx, "signup", i), None),
+        expected=(201,),
+    ),
+    Scenario(
+        "confirm_email",
+        "GET",
+        lambda ctx, i: (
+            reverse(
+                "confirm-email",
+                args=[ctx["resident_ids"][i % len(ctx["resident_ids"])]],
+            ),
+            None,
+            _bearer(ctx["gov_token"]),
+        ),
+    ),
+    Scenario(
+        "admin_create",
+        "POST",
+        lambda ctx, i: (
+            reverse("admin-create"),
+            _new_user(ctx, "admin", i),
+            ctx["api_key"],
+        ),
+        expected=(201,),
+    ),
+    Scenario(
+        "event_create",
+        "POST",
+        lambda ctx, i: (
+            reverse("add-event"),
+            {
+                "event_name": f"Load test event {ctx['run']}-{i}",
+                "event_hosts": "loadtest",
+                "description": "Generated by the loadtest command",
+                "image_url": "https://example.com/event.jpg",
+                "event_date": ctx["future"],
+                "registration_deadline": ctx["future"],
+                "category": ctx["category_id"],
+                "location": "Load test venue",
+                "capacity": 100,
+            },
+            _bearer(ctx["gov_token"]),
+        ),
+        expected=(201,),
+    ),
+    Scenario(
+        "export",
+        "GET",
+        lambda ctx, i: (
+            reverse("export-events") + "?" + urlencode({"location": "Venue 42"}),
+            None,
+            _bearer(ctx["gov_token"]),
+        ),
+    ),
+    Scenario(
+        "cache_metrics",
+        "GET",
+        lambda ctx, i: (reverse("cache-metrics"), None, _bearer(ctx["gov_token"])),
+    ),
+]
+
+
+class InProcessTransport:
+    """Requests through Django's test client, one client per thread."""
+
+    target = "in-process"
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def request(self, method, path, body, authorization):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = Client(
+                HTTP_HOST="localhost", raise_request_exception=False
+            )
+        headers = {"HTTP_AUTHORIZATION": authorization} if authorization else {}
+        response = client.generic(
+            method,
+            path,
+            json.dumps(body) if body is not None else "",
+            content_type="application/json",
+            **headers,
+        )
+        if response.streaming:
+            b"".join(response.streaming_content)
+        # Stay anonymous between requests: a login's session cookie would
+        # otherwise authenticate (and CSRF-check) the next one.
+        client.cookies.clear()
+        return response.status_code, response.get("X-Query-Count")
+
+    def close(self):
+        connection.close()
+
+
+class HTTPTransport:
+    """Keep-alive HTTP/1.1 connections to a running server, one per thread."""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.target = url
+        self._local = threading.local()
+
+    def request(self, method, path, body, authorization):
+        headers = {"Content-Type": "application/json", "Host": "localhost"}
+        if authorization:
+            headers["Authorization"] = authorization
+        payload = json.dumps(body) if body is not None else None
+        for attempt in range(2):
+            conn = getattr(self._local, "conn", None)
+            if conn is None:
+                conn = self._local.conn = http.client.HTTPConnection(
+                    self.host, self.port, timeout=60
+                )
+            try:
+                conn.request(method, path, payload, headers)
+                response = conn.getresponse()
+                response.read()
+                return response.status, response.getheader("X-Query-Count")
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+
+
+def _percentile(cuts, p):
+    return round(cuts[p - 1], 3) if cuts else None
+
+
+def _ms(value):
+    # Percentiles need at least two samples.
+    return f"{value:>8.2f}" if value is not None else f"{'-':>8}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a dataset and load every API route in-process or against a "
+        "running server; report throughput, latency percentiles and queries "
+        "per request as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            help="Base URL of a running server (e.g. gunicorn on "
+            "http://127.0.0.1:8000) sharing this database; in-process if omitted",
+        )
+        parser.add_argument(
+            "--scenarios",
+            default=",".join(scenario.name for scenario in SCENARIOS),
+            help="Comma separated subset of scenarios to run",
+        )
+        parser.add_argument("--requests", type=int, default=200, help="Per scenario")
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--events", type=int, default=10_000)
+        parser.add_argument("--users", type=int, default=500)
+        parser.add_argument(
+            "--storm-capacity",
+            type=int,
+            default=100,
+            help="Seats on the event the registration storm races for",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file")
+        parser.add_argument(
+            "--baseline",
+            help="Earlier JSON report; fail if p95 latency grows by more than "
+            "--tolerance or any route runs more queries per request",
+        )
+        parser.add_argument("--tolerance", type=float, default=0.25)
+        parser.add_argument(
+            "--cleanup", action="store_true", help="Delete all load test data"
+        )
+
+    def handle(self, *args, **options):
+        if options["cleanup"]:
+            self.cleanup()
+            return
+
+        names = options["scenarios"].split(",")
+        unknown = set(names) - {scenario.name for scenario in SCENARIOS}
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+        ctx = self.seed(options)
+        transport = (
+            HTTPTransport(options["url"]) if options["url"] else InProcessTransport()
+        )
+        results = {}
+        # Throttling would turn most of the load into 429s, and queries per
+        # request are read from X-Query-Count. A server under test needs
+        # THROTTLE_ENABLED=False and QUERY_COUNT_HEADER=True in its own
+        # environment.
+        with override_settings(THROTTLE_ENABLED=False, QUERY_COUNT_HEADER=True):
+            for scenario in SCENARIOS:
+                if scenario.name in names:
+                    results[scenario.name] = self.run_scenario(
+                        scenario, ctx, transport, options
+                    )
+                    self.print_result(scenario.name, results[scenario.name])
+        ApiKey.objects.filter(pk=ctx["api_key_id"]).delete()
+
+        report = {
+            "commit": self.git_commit(),
+            "target": transport.target,
+            "vendor": connection.vendor,
+            "requests": options["requests"],
+            "concurrency": options["concurrency"],
+            "dataset": {"events": options["events"], "users": options["users"]},
+            "scenarios": results,
+        }
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
+        if options["baseline"]:
+            self.compare(report, options["baseline"], options["tolerance"])
+
+    def seed(self, options, batch_size=5000):
+        run = uuid.uuid4().hex[:8]
+        now = timezone.now()
+        category, _ = Category.objects.get_or_create(name=LOADTEST_CATEGORY)
+
+        existing = EventModel.objects.filter(category=category).count()
+        for start in range(existing, options["events"], batch_size):
+            EventModel.objects.bulk_create(
+                EventModel(
+                    event_name=f"Event {index}",
+                    event_hosts="loadtest",
+                    description="Generated by the loadtest command",
+                    image_url="https://example.com/event.jpg",
+                    event_date=now + timedelta(hours=index),
+                    registration_deadline=now + timedelta(hours=index),
+                    category=category,
+                    location=f"Venue {index % 100}",
+                    capacity=1000,
+                )
+                for index in range(start, min(start + batch_size, options["events"]))
+            )
+
+        residents = CustomUser.objects.filter(
+            email__startswith=f"{EMAIL_PREFIX}resident-"
+        )
+        missing = options["users"] - residents.count()
+        if missing > 0:
+            password = make_password(PASSWORD)
+            offset = residents.count()
+            CustomUser.objects.bulk_create(
+                CustomUser(
+                    email=f"{EMAIL_PREFIX}resident-{offset + index}@example.invalid",
+                    password=password,
+                    first_name="Load",
+                    last_name="Test",
+                )
+                for index in range(missing)
+            )
+        residents = list(
+            residents.order_by("pk").values_list("pk", "email")[: options["users"]]
+        )
+
+        gov, _ = CustomUser.objects.get_or_create(
+            email=f"{EMAIL_PREFIX}admin@example.invalid",
+            defaults={"is_government_authority": True},
+        )
+        if not gov.check_password(PASSWORD):
+            gov.set_password(PASSWORD)
+            gov.save(update_fields=["password"])
+        gov.groups.add(Group.objects.get_or_create(name=GOVERNMENT_AUTHORITY)[0])
+        gov_refresh = RoleRefreshToken.for_user(gov)
+
+        storm_event, async_storm_event = (
+            EventModel.objects.create(
+                event_name=f"Registration storm {run}{suffix}",
+                event_hosts="loadtest",
+                description="Generated by the loadtest command",
+                image_url="https://example.com/event.jpg",
+                event_date=now + timedelta(days=7),
+                registration_deadline=now + timedelta(days=6),
+                category=category,
+                location="Storm venue",
+                capacity=options["storm_capacity"],
+            )
+            for suffix in ("", " (async)")
+        )
+        api_key, raw_key = ApiKey.create_key()
+
+        first = EventModel.objects.filter(category=category).earliest("id")
+        list_params = [dict(params) for params in LIST_PARAMS]
+        list_params[-1]["date"] = timezone.localdate(first.event_date).isoformat()
+        calendar_params = []
+        for params in CALENDAR_PARAMS:
+            params = dict(params)
+            start = timezone.localdate(first.event_date)
+            end = start + timedelta(days=params.pop("days"))
+            calendar_params.append(
+                {"from": start.isoformat(), "to": end.isoformat(), **params}
+            )
+
+        tokens = [
+            str(RoleRefreshToken.for_user(CustomUser(pk=pk)).access_token)
+            for pk, _ in residents[: max(options["concurrency"] * 4, 1)]
+        ]
+        storm_tokens = [
+            str(RoleRefreshToken.for_user(CustomUser(pk=pk)).access_token)
+            for pk, _ in residents[: options["requests"]]
+        ]
+        return {
+            "run": run,
+            "category_id": category.pk,
+            "event_ids": list(
+                EventModel.objects.filter(category=category).values_list(
+                    "pk", flat=True
+                )[:1000]
+            ),
+            "list_params": list_params,
+            "calendar_params": calendar_params,
+            "residents": [email for _, email in residents],
+            "resident_ids": [pk for pk, _ in residents],
+            "tokens": tokens,
+            "storm_tokens": storm_tokens,
+            "storm_event_id": storm_event.pk,
+            "async_storm_event_id": async_storm_event.pk,
+            "gov": gov,
+            "gov_email": gov.email,
+            "gov_token": str(gov_refresh.access_token),
+            "gov_refresh": str(gov_refresh),
+            "api_key": raw_key,
+            "api_key_id": api_key.pk,
+            "future": (now + timedelta(days=30)).isoformat(),
+        }
+
+    def run_scenario(self, scenario, ctx, transport, options):
+        counter = itertools.count()
+        lock = threading.Lock()
+        latencies, queries, statuses = [], [], Counter()
+
+        def worker():
+            try:
+                while True:
+                    with lock:
+                        i = next(counter)
+                    if i >= options["requests"]:
+                        return
+                    path, body, authorization = scenario.build(ctx, i)
+                    started = time.perf_counter()
+                    try:
+                        status, query_count = transport.request(
+                            scenario.method, path, body, authorization
+                        )
+                    except Exception as exc:
+                        status, query_count = type(exc).__name__, None
+                    elapsed = (time.perf_counter() - started) * 1000
+                    with lock:
+                        latencies.append(elapsed)
+                        statuses[status] += 1
+                        if query_count is not None:
+                            queries.append(int(query_count))
+            finally:
+                transport.close()
+
+        threads = [
+            threading.Thread(target=worker) for _ in range(options["concurrency"])
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+
+        cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else []
+        return {
+            "requests": len(latencies),
+            "errors": sum(
+                count
+                for status, count in statuses.items()
+                if status not in scenario.expected
+            ),
+            "statuses": {
+                str(status): count
+                for status, count in sorted(statuses.items(), key=str)
+            },
+            "throughput_rps": round(len(latencies) / wall, 1),
+            "mean_ms": round(statistics.fmean(latencies), 3),
+            "p50_ms": _percentile(cuts, 50),
+            "p95_ms": _percentile(cuts, 95),
+            "p99_ms": _percentile(cuts, 99),
+            "queries_per_request": (
+                round(statistics.fmean(queries), 2) if queries else None
+            ),
+        }
+
+    def print_result(self, name, result):
+        self.stdout.write(
+            f"{name:<24} {result['throughput_rps']:>8.1f} req/s  "
+            f"p50 {_ms(result['p50_ms'])}  p95 {_ms(result['p95_ms'])}  "
+            f"p99 {_ms(result['p99_ms'])} ms  "
+            f"{result['queries_per_request']} q/req  "
+            f"{result['errors']} errors  {result['statuses']}"
+        )
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def compare(self, report, baseline_path, tolerance):
+        with open(baseline_path) as fh:
+            baseline = json.load(fh)["scenarios"]
+
+        regressions = []
+        for name, result in report["scenarios"].items():
+            before = baseline.get(name)
+            if before is None:
+                continue
+            if result["errors"] > before["errors"]:
+                regressions.append(f"{name}: {result['errors']} errors")
+            if (
+                result["p95_ms"] is not None
+                and before["p95_ms"] is not None
+                and result["p95_ms"] > before["p95_ms"] * (1 + tolerance)
+            ):
+                regressions.append(
+                    f"{name}: p95 {before['p95_ms']} -> {result['p95_ms']} ms"
+                )
+            if (result["queries_per_request"] or 0) > (
+                before["queries_per_request"] or 0
+            ):
+                regressions.append(
+                    f"{name}: queries/request {before['queries_per_request']} -> "
+                    f"{result['queries_per_request']}"
+                )
+
+        if regressions:
+            raise CommandError("Performance regressions:\n" + "\n".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No performance regressions"))
+
+    def cleanup(self):
+        users, _ = CustomUser.objects.filter(email__startswith=EMAIL_PREFIX).delete()
+        # Also the categories made by the category scenarios.
+        events, _ = Category.objects.filter(name__startswith=LOADTEST_CATEGORY).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {users + events} row(s)"))
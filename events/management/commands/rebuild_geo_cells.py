@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from events.cache import EVENTS, bump_generation
+from events.models import EventModel
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every event's grid cell, e.g. after changing "
+        "GEO_CELL_DEGREES or updating coordinates with queryset.update()"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=2000, help="Rows per UPDATE batch"
+        )
+
+    def handle(self, *args, **options):
+        events = EventModel.objects.only("pk", "latitude", "longitude", "geo_cell")
+        changed = last_pk = 0
+        while True:
+            batch = list(
+                events.filter(pk__gt=last_pk).order_by("pk")[: options["batch_size"]]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            stale = []
+            for event in batch:
+                cell = event.geo_cell
+                event.set_geo_cell()
+                if event.geo_cell != cell:
+                    stale.append(event)
+            with transaction.atomic():
+                changed += EventModel.objects.bulk_update(stale, ["geo_cell"])
+
+        if changed:
+            bump_generation(EVENTS)
+        self.stdout.write(f"Updated the grid cell of {changed} events")
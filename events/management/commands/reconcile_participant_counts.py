@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from events.cache import EVENTS, bump_generation
+from events.models import EventModel
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Recompute EventModel.participant_count from the participation table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="Number of events checked per UPDATE (default: 10000)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drifted events without fixing them",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        Participation = CustomUser.events_joined.through
+        actual = Coalesce(
+            Subquery(
+                Participation.objects.filter(eventmodel_id=OuterRef("pk"))
+                .order_by()
+                .values("eventmodel_id")
+                .annotate(total=Count("pk"))
+                .values("total")
+            ),
+            0,
+        )
+
+        drifted = 0
+        last_id = 0
+        while True:
+            ids = list(
+                EventModel.objects.filter(pk__gt=last_id)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            last_id = ids[-1]
+
+            with transaction.atomic():
+                stale = (
+                    EventModel.objects.filter(pk__in=ids)
+                    .annotate(actual=actual)
+                    .exclude(participant_count=F("actual"))
+                )
+                if options["dry_run"]:
+                    for event in stale.only("pk", "participant_count"):
+                        self.stdout.write(
+                            f"Event {event.pk}: stored {event.participant_count}, "
+                            f"actual {event.actual}"
+                        )
+                        drifted += 1
+                else:
+                    drifted += EventModel.objects.filter(
+                        pk__in=stale.values("pk")
+                    ).update(participant_count=actual, updated_at=timezone.now())
+
+        if drifted and not options["dry_run"]:
+            bump_generation(EVENTS)
+
+        verb = "Found" if options["dry_run"] else "Fixed"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {drifted} drifted event(s)"))
@@ -0,0 +1,195 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from events.cache import EVENTS, bump_generation
+from events.lifecycle import advance_event_statuses
+from events.models import Category, EventModel
+from users.models import CustomUser
+from users.roles import RESIDENTS
+
+CATEGORY_NAMES = [
+    "Music",
+    "Sports",
+    "Arts",
+    "Education",
+    "Community",
+    "Health",
+    "Technology",
+    "Food",
+    "Business",
+    "Family",
+]
+WORDS = [
+    "Annual",
+    "City",
+    "Summer",
+    "Winter",
+    "Open",
+    "Night",
+    "Festival",
+    "Fair",
+    "Meetup",
+    "Workshop",
+    "Concert",
+    "Market",
+    "Tournament",
+    "Gala",
+    "Forum",
+    "Parade",
+]
+DISTRICTS = ["North", "South", "East", "West", "Central", "Harbour", "Old Town"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-generate a deterministic synthetic dataset of users, events and "
+        "registrations for sizing deployments"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100_000)
+        parser.add_argument("--events", type=int, default=100_000)
+        parser.add_argument(
+            "--registrations",
+            type=int,
+            default=1_000_000,
+            help="Approximate total; each event gets a skewed share, capped at "
+            "the number of users",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument(
+            "--password",
+            default="seed-password",
+            help="Password of every generated user (hashed once)",
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.email_prefix = f"seed-{options['seed']}-"
+        if CustomUser.objects.filter(email__startswith=self.email_prefix).exists():
+            raise CommandError(
+                f"Users from seed {options['seed']} already exist; pick another --seed"
+            )
+
+        started = time.perf_counter()
+        user_ids = self.seed_users(options["users"], options["password"])
+        events, registrations = self.seed_events(
+            options["events"], options["registrations"], user_ids
+        )
+        elapsed = time.perf_counter() - started
+
+        advance_event_statuses()
+        bump_generation(EVENTS)
+        rows = len(user_ids) + events + registrations
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(user_ids)} users, {events} events and "
+                f"{registrations} registrations in {elapsed:.1f}s "
+                f"({rows / elapsed:,.0f} rows/s)"
+            )
+        )
+
+    def report(self, label, done, total, started):
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{label}: {done}/{total} ({done / max(elapsed, 1e-9):,.0f} rows/s)"
+        )
+
+    def seed_users(self, count, password):
+        # One hash for everyone: hashing is deliberately slow, and bulk_create
+        # skips the post_save signal, so residents are added to their group
+        # with one through-table insert per batch instead of a lookup per user.
+        password = make_password(password)
+        residents, _ = Group.objects.get_or_create(name=RESIDENTS)
+        Membership = CustomUser.groups.through
+
+        user_ids = []
+        started = time.perf_counter()
+        for start in range(0, count, self.batch_size):
+            with transaction.atomic():
+                users = CustomUser.objects.bulk_create(
+                    CustomUser(
+                        email=f"{self.email_prefix}{index}@example.invalid",
+                        password=password,
+                        first_name=self.rng.choice(WORDS),
+                        last_name=self.rng.choice(DISTRICTS),
+                    )
+                    for index in range(start, min(start + self.batch_size, count))
+                )
+                Membership.objects.bulk_create(
+                    Membership(customuser_id=user.pk, group_id=residents.pk)
+                    for user in users
+                )
+            user_ids.extend(user.pk for user in users)
+            self.report("Users", len(user_ids), count, started)
+        return user_ids
+
+    def seed_events(self, count, registrations, user_ids):
+        categories = [
+            Category.objects.get_or_create(name=name)[0].pk for name in CATEGORY_NAMES
+        ]
+        # Popularity is heavily skewed, like real events: a few draw crowds,
+        # most draw a handful.
+        weights = [self.rng.paretovariate(1.5) for _ in range(count)]
+        scale = registrations / sum(weights) if weights else 0
+        Participation = CustomUser.events_joined.through
+        now = timezone.now()
+
+        created = registered = 0
+        started = time.perf_counter()
+        for start in range(0, count, self.batch_size):
+            batch = []
+            for index in range(start, min(start + self.batch_size, count)):
+                attendees = min(round(weights[index] * scale), len(user_ids))
+                event_date = now + timedelta(
+                    minutes=self.rng.randint(-365 * 24 * 60, 365 * 24 * 60)
+                )
+                batch.append(
+                    EventModel(
+                        event_name=" ".join(self.rng.sample(WORDS, 3)),
+                        event_hosts=f"Host {self.rng.randint(1, 5000)}",
+                        description="Generated by the seed_data command",
+                        image_url=f"https://example.com/events/{index}.jpg",
+                        event_date=event_date,
+                        registration_deadline=event_date - timedelta(days=1),
+                        category_id=self.rng.choice(categories),
+                        location=f"{self.rng.choice(DISTRICTS)} "
+                        f"Hall {self.rng.randint(1, 200)}",
+                        capacity=attendees + self.rng.randint(0, 500),
+                        # Written directly since bulk inserts skip the signals
+                        # that usually maintain it.
+                        participant_count=attendees,
+                    )
+                )
+
+            with transaction.atomic():
+                events = EventModel.objects.bulk_create(batch)
+                rows = []
+                for event in events:
+                    for position in self.rng.sample(
+                        range(len(user_ids)), event.participant_count
+                    ):
+                        rows.append(
+                            Participation(
+                                customuser_id=user_ids[position], eventmodel_id=event.pk
+                            )
+                        )
+                    if len(rows) >= self.batch_size:
+                        Participation.objects.bulk_create(rows)
+                        registered += len(rows)
+                        rows = []
+                Participation.objects.bulk_create(rows)
+                registered += len(rows)
+
+            created += len(events)
+            self.report("Events", created, count, started)
+        self.report("Registrations", registered, registrations, started)
+        return created, registered
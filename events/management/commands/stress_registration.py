@@ -0,0 +1,112 @@
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from events.models import Category, EventModel
+from events.registration import RegistrationError, register_participant
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Stress the registration engine with concurrent threads against one "
+        "event and fail if it is ever oversold"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=300)
+        parser.add_argument("--capacity", type=int, default=100)
+        parser.add_argument(
+            "--attempts",
+            type=int,
+            default=2,
+            help="Registrations each thread tries (repeats must be rejected)",
+        )
+        parser.add_argument(
+            "--keep", action="store_true", help="Keep the generated rows"
+        )
+
+    def handle(self, *args, **options):
+        threads, capacity = options["threads"], options["capacity"]
+        tag = uuid.uuid4().hex[:8]
+
+        category, _ = Category.objects.get_or_create(name="Stress Test")
+        event = EventModel.objects.create(
+            event_name=f"Stress test {tag}",
+            event_hosts="stress_registration",
+            description="Generated by the stress_registration command",
+            image_url="https://example.com/stress.jpg",
+            event_date=timezone.now() + timedelta(days=7),
+            registration_deadline=timezone.now() + timedelta(days=6),
+            category=category,
+            location="Benchmark",
+            capacity=capacity,
+        )
+        password = make_password(None)
+        users = CustomUser.objects.bulk_create(
+            CustomUser(email=f"stress-{tag}-{index}@example.invalid", password=password)
+            for index in range(threads)
+        )
+
+        outcomes = Counter()
+        lock = threading.Lock()
+        barrier = threading.Barrier(threads)
+
+        def worker(user):
+            barrier.wait()
+            try:
+                for _ in range(options["attempts"]):
+                    try:
+                        register_participant(event.pk, user)
+                        result = "registered"
+                    except RegistrationError as e:
+                        result = type(e).__name__
+                    except Exception as e:
+                        result = f"error: {e}"
+                    with lock:
+                        outcomes[result] += 1
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker, args=(user,)) for user in users]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        event.refresh_from_db(fields=["participant_count"])
+        rows = event.participants.count()
+        attempts = threads * options["attempts"]
+
+        self.stdout.write(f"Attempts:          {attempts} in {elapsed:.2f}s")
+        self.stdout.write(
+            f"Throughput:        {attempts / elapsed:.1f} registrations/s"
+        )
+        for result, count in sorted(outcomes.items()):
+            self.stdout.write(f"  {result:<18} {count}")
+        self.stdout.write(f"participant_count: {event.participant_count}")
+        self.stdout.write(f"participant rows:  {rows}")
+
+        if not options["keep"]:
+            event.delete()
+            CustomUser.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+        expected = min(capacity, threads)
+        if rows > capacity or event.participant_count != rows:
+            raise CommandError(
+                f"Oversold: {rows} participants, counter {event.participant_count}, "
+                f"capacity {capacity}"
+            )
+        if outcomes["registered"] != expected or rows != expected:
+            raise CommandError(
+                f"Expected {expected} registrations, got {outcomes['registered']}"
+            )
+        self.stdout.write(self.style.SUCCESS("PASS: zero oversells"))
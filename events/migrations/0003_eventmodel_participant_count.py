@@ -0,0 +1,37 @@
+# Generated by Django 5.0.7 on 2026-10-18 15:58
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_participant_count(apps, schema_editor):
+    EventModel = apps.get_model("events", "EventModel")
+    Participation = apps.get_model("users", "CustomUser").events_joined.through
+    counts = (
+        Participation.objects.filter(eventmodel_id=OuterRef("pk"))
+        .order_by()
+        .values("eventmodel_id")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    EventModel.objects.using(schema_editor.connection.alias).update(
+        participant_count=Coalesce(Subquery(counts), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0002_alter_eventmodel_options"),
+        ("users", "0002_alter_customuser_options"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="eventmodel",
+            name="participant_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_participant_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.0.7 on 2026-10-18 16:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0003_eventmodel_participant_count"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="eventmodel",
+            index=models.Index(fields=["event_date", "id"], name="event_date_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="eventmodel",
+            index=models.Index(
+                fields=["status", "event_date"], name="event_status_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eventmodel",
+            index=models.Index(
+                fields=["category", "event_date"], name="event_category_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eventmodel",
+            index=models.Index(fields=["event_name", "id"], name="event_name_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="eventmodel",
+            index=models.Index(fields=["location", "id"], name="event_location_id_idx"),
+        ),
+    ]
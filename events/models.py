@@ -1,5 +1,8 @@
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
+from .geo import grid_cell
+
 
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -27,13 +30,40 @@ class EventModel(models.Model):
     event_date = models.DateTimeField(blank=False, auto_now_add=False)
     category = models.ForeignKey(Category, on_delete=models.CASCADE)
     location = models.CharField(max_length=100)
+    latitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)],
+    )
+    longitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)],
+    )
+    # Grid cell of (latitude, longitude), see events.geo; kept in step by
+    # save() and bulk_create_events.
+    geo_cell = models.BigIntegerField(null=True, blank=True, editable=False)
     registration_deadline = models.DateTimeField(blank=False, auto_now_add=False)
     capacity = models.IntegerField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=UPCOMING)
+    # Denormalized size of ``participants``; maintained by events.signals.
+    participant_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
+        # Each index matches a list filter/ordering combination; the trailing
+        # id is the keyset pagination tie-breaker.
+        indexes = [
+            models.Index(fields=["event_date", "id"], name="event_date_id_idx"),
+            models.Index(fields=["status", "event_date"], name="event_status_date_idx"),
+            models.Index(
+                fields=["category", "event_date"], name="event_category_date_idx"
+            ),
+            models.Index(fields=["event_name", "id"], name="event_name_id_idx"),
+            models.Index(fields=["location", "id"], name="event_location_id_idx"),
+            models.Index(fields=["geo_cell"], name="event_geo_cell_idx"),
+        ]
         permissions = [
             ("view_event", "Can view event"),
             ("change_event", "Can change event"),
@@ -43,3 +73,26 @@ class EventModel(models.Model):
 
     def __str__(self):
         return self.event_name
+
+    def set_geo_cell(self):
+        self.geo_cell = grid_cell(self.latitude, self.longitude)
+
+    def save(self, *args, **kwargs):
+        if not {"latitude", "longitude"} & self.get_deferred_fields():
+            self.set_geo_cell()
+        # The counter is only ever changed with F() updates; never write back
+        # a possibly stale in-memory value when the rest of the row is saved.
+        if not self._state.adding and "update_fields" not in kwargs:
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name != "participant_count"
+                and field.attname not in deferred
+            ]
+        elif kwargs.get("update_fields") is not None:
+            update_fields = set(kwargs["update_fields"])
+            if update_fields & {"latitude", "longitude"}:
+                kwargs["update_fields"] = update_fields | {"geo_cell"}
+        super().save(*args, **kwargs)
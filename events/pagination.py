@@ -0,0 +1,234 @@
+import base64
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework.exceptions import ParseError
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _positive_int(value, cutoff=None):
+    value = int(value)
+    if value <= 0:
+        raise ValueError
+    if cutoff:
+        return min(value, cutoff)
+    return value
+
+
+def _invert(field):
+    return field[1:] if field.startswith("-") else "-" + field
+
+
+def _resolve_field(queryset, path):
+    if path in queryset.query.annotations:
+        return queryset.query.annotations[path].output_field
+    model = queryset.model
+    parts = path.split(LOOKUP_SEP)
+    for part in parts[:-1]:
+        model = model._meta.get_field(part).related_model
+    return model._meta.get_field(parts[-1])
+
+
+def _get_value(instance, path):
+    for part in path.split(LOOKUP_SEP):
+        instance = getattr(instance, part)
+    return instance
+
+
+class EventCursorPagination(BasePagination):
+    """
+    Keyset pagination over the active ordering, with ``id`` as a tie-breaker.
+
+    Every page is a single ``LIMIT page_size + 1`` query that seeks past the
+    last row seen, so the cost of a page does not depend on how deep it is or
+    how large the table has grown. Cursors are opaque base64 tokens.
+    """
+
+    cursor_query_param = "cursor"
+    cursor_query_description = "The pagination cursor value."
+    page_size_query_param = "page_size"
+    page_size_query_description = "Number of results to return per page."
+    page_size = settings.EVENT_LIST_PAGE_SIZE
+    max_page_size = settings.EVENT_LIST_MAX_PAGE_SIZE
+    default_ordering = ("event_date",)
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        return self.set_page([row async for row in queryset])
+
+    def get_page_queryset(self, queryset, request, view):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        cursor = self.decode_cursor(request, queryset)
+        self.reverse = bool(cursor and cursor["r"])
+        self.has_cursor = cursor is not None
+
+        ordering = self.ordering
+        if self.reverse:
+            ordering = [_invert(field) for field in ordering]
+        queryset = queryset.order_by(*ordering)
+        if cursor is not None:
+            queryset = queryset.filter(self.seek(ordering, cursor["p"]))
+
+        # Fetch one extra row to find out whether another page follows.
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, results):
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.has_cursor
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        for backend in getattr(view, "filter_backends", []):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+
+        ordering = list(ordering or self.default_ordering)
+        if not any(field.lstrip("-") in ("id", "pk") for field in ordering):
+            ordering.append("-id" if ordering[-1].startswith("-") else "id")
+        return ordering
+
+    def seek(self, ordering, values):
+        """
+        Build the row-value comparison ``(f1, f2, ...) > (v1, v2, ...)`` as
+        an OR of prefix-equality clauses, honouring each field's direction.
+
+        The OR is ANDed with a plain range bound on the leading field so the
+        planner can seek an index on it instead of expanding every branch.
+        """
+        first = ordering[0]
+        lookup = "lte" if first.startswith("-") else "gte"
+        bound = Q(**{f"{first.lstrip('-')}__{lookup}": values[0]})
+        condition = Q()
+        for index, field in enumerate(ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            clause = Q(**{f"{name}__{lookup}": values[index]})
+            for prev_field, prev_value in zip(ordering[:index], values[:index]):
+                clause &= Q(**{prev_field.lstrip("-"): prev_value})
+            condition |= clause
+        return bound & condition
+
+    def decode_cursor(self, request, queryset):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            if payload["o"] != self.ordering:
+                raise ValueError
+            raw_values = payload["p"]
+            if len(raw_values) != len(self.ordering):
+                raise ValueError
+            values = [
+                _resolve_field(queryset, field.lstrip("-")).to_python(value)
+                for field, value in zip(self.ordering, raw_values)
+            ]
+            return {"p": values, "r": bool(payload.get("r", False))}
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise ParseError(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance, reverse):
+        values = []
+        for field in self.ordering:
+            value = _get_value(instance, field.lstrip("-"))
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+
+        payload = json.dumps({"o": self.ordering, "p": values, "r": reverse})
+        encoded = base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # An empty reverse page means we walked back past the first row.
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                    "example": "http://127.0.0.1:8000/api/events/event-list/?cursor=eyJvIjpbImV2ZW50X2RhdGUiLCJpZCJdfQ==",
+                },
+                "previous": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                    "example": "http://127.0.0.1:8000/api/events/event-list/?cursor=eyJvIjpbImV2ZW50X2RhdGUiLCJpZCJdfQ==",
+                },
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": self.cursor_query_description,
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": self.page_size_query_description,
+                "schema": {"type": "integer"},
+            },
+        ]
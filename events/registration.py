@@ -0,0 +1,121 @@
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.http import Http404
+from django.utils import timezone
+from rest_framework import status
+
+from users.models import CustomUser
+from .cache import EVENTS, bump_generation
+from .models import EventModel
+
+Participation = CustomUser.events_joined.through
+
+
+class RegistrationError(Exception):
+    message = "Registration failed."
+    status_code = status.HTTP_400_BAD_REQUEST
+
+
+class AlreadyRegistered(RegistrationError):
+    message = "You are already registered for this event."
+
+
+class EventFull(RegistrationError):
+    message = "Event is full"
+    status_code = status.HTTP_405_METHOD_NOT_ALLOWED
+
+
+class RegistrationClosed(RegistrationError):
+    message = "Registration for this event is closed."
+
+
+def register_participant(event_id, user):
+    """
+    Register ``user`` for the event and return the new participant count.
+
+    A seat is claimed with one guarded UPDATE that only matches while the
+    event is open and below capacity, and the participation row is inserted
+    in the same transaction; the unique constraint on the through table
+    rolls the seat back for duplicate registrations. No participant rows are
+    counted and no check-then-act window exists, so concurrent requests can
+    never oversell an event.
+    """
+    now = timezone.now()
+    total = _claim_seat(event_id, user, now)
+    if total is None:
+        _raise_rejection(event_id, user, now)
+    return total
+
+
+async def aregister_participant(event_id, user):
+    """
+    ``register_participant`` for async views. The async ORM has no
+    transactions, so the claim itself runs in one ``sync_to_async`` call;
+    working out why a claim was refused uses the async ORM.
+    """
+    now = timezone.now()
+    total = await sync_to_async(_claim_seat)(event_id, user, now)
+    if total is None:
+        await _araise_rejection(event_id, user, now)
+    return total
+
+
+def _claim_seat(event_id, user, now):
+    try:
+        with transaction.atomic():
+            claimed = EventModel.objects.filter(
+                pk=event_id,
+                status=EventModel.UPCOMING,
+                registration_deadline__gte=now,
+                participant_count__lt=F("capacity"),
+            ).update(participant_count=F("participant_count") + 1, updated_at=now)
+
+            if claimed:
+                # Bypasses m2m_changed on purpose: the seat is already counted.
+                Participation.objects.create(
+                    customuser_id=user.pk, eventmodel_id=event_id
+                )
+                bump_generation(EVENTS)
+                # Reading the counter back inside the transaction returns the
+                # value this request wrote; the row stays locked until commit.
+                return (
+                    EventModel.objects.filter(pk=event_id)
+                    .values_list("participant_count", flat=True)
+                    .get()
+                )
+    except IntegrityError:
+        raise AlreadyRegistered()
+    return None
+
+
+def _rejection_queries(event_id, user):
+    event = EventModel.objects.filter(pk=event_id).only(
+        "status", "registration_deadline", "capacity", "participant_count"
+    )
+    registered = Participation.objects.filter(
+        customuser_id=user.pk, eventmodel_id=event_id
+    )
+    return event, registered
+
+
+def _rejection(event, registered, now):
+    if event is None:
+        return Http404("No EventModel matches the given query.")
+    if registered:
+        return AlreadyRegistered()
+    if event.status != EventModel.UPCOMING or event.registration_deadline < now:
+        return RegistrationClosed()
+    return EventFull()
+
+
+def _raise_rejection(event_id, user, now):
+    event, registered = _rejection_queries(event_id, user)
+    event = event.first()
+    raise _rejection(event, event is not None and registered.exists(), now)
+
+
+async def _araise_rejection(event_id, user, now):
+    event, registered = _rejection_queries(event_id, user)
+    event = await event.afirst()
+    raise _rejection(event, event is not None and await registered.aexists(), now)
@@ -3,7 +3,6 @@ from .models import Category, EventModel
 from django.utils.translation import gettext_lazy as _
 from users.models import CustomUser
 from drf_spectacular.utils import (
-    extend_schema_field,
     OpenApiExample,
     extend_schema_serializer,
 )
@@ -15,16 +14,63 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ["id", "name"]
 
 
+class CategoryRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key field that resolves against a ``categories`` mapping in the
+    serializer context when one is given, so bulk callers can look all
+    categories up with one query.
+    """
+
+    def to_internal_value(self, data):
+        categories = self.context.get("categories")
+        if categories is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            category = categories.get(int(data))
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if category is None:
+            self.fail("does_not_exist", pk_value=data)
+        return category
+
+
 class EventSerializer(serializers.ModelSerializer):
-    category_name = serializers.SerializerMethodField()
+    category = CategoryRelatedField(queryset=Category.objects.all())
+    category_name = serializers.CharField(source="category.name", read_only=True)
+    # Only present when the list is filtered with ``near``.
+    distance_km = serializers.FloatField(read_only=True, required=False)
 
     class Meta:
         model = EventModel
-        fields = "__all__"
+        exclude = ["geo_cell"]
+        annotated_fields = ["distance_km"]
+
+    def validate(self, attrs):
+        latitude = attrs.get("latitude", getattr(self.instance, "latitude", None))
+        longitude = attrs.get("longitude", getattr(self.instance, "longitude", None))
+        if (latitude is None) != (longitude is None):
+            raise serializers.ValidationError(
+                "latitude and longitude must be given together."
+            )
+        return attrs
+
+
+class EventCalendarSerializer(serializers.Serializer):
+    date = serializers.DateField(help_text="The local day, or first day of the month")
+    count = serializers.IntegerField()
 
-    @extend_schema_field(serializers.CharField)
-    def get_category_name(self, obj):
-        return obj.category.name
+
+class FacetBucketSerializer(serializers.Serializer):
+    value = serializers.CharField()
+    count = serializers.IntegerField()
+
+
+class EventFacetsSerializer(serializers.Serializer):
+    category = FacetBucketSerializer(many=True, required=False)
+    status = FacetBucketSerializer(many=True, required=False)
+    location = FacetBucketSerializer(many=True, required=False)
 
 
 class ErrorSerializer(serializers.Serializer):
@@ -55,6 +101,7 @@ class EventDetailSerializer(serializers.ModelSerializer):
             "updated_at",
             "status",
             "category",
+            "participant_count",
             "participants",
         ]
 
@@ -69,6 +116,10 @@ class EventDetailSerializer(serializers.ModelSerializer):
             },
         ),
         OpenApiExample("Event is Full", value={"message": "Event is full"}),
+        OpenApiExample(
+            "Registration Closed",
+            value={"message": "Registration for this event is closed."},
+        ),
         OpenApiExample(
             "Already Registered",
             value={"message": "You are already registered for this event."},
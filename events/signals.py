@@ -0,0 +1,88 @@
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from users.models import CustomUser
+from .cache import CATEGORIES, EVENTS, bump_generation
+from .models import Category, EventModel
+
+Participation = CustomUser.events_joined.through
+
+
+def _adjust(event_ids, delta):
+    if event_ids and delta:
+        # Also touch updated_at, which feeds the ETag/Last-Modified headers.
+        EventModel.objects.filter(pk__in=event_ids).update(
+            participant_count=F("participant_count") + delta,
+            updated_at=timezone.now(),
+        )
+
+
+@receiver(m2m_changed, sender=Participation)
+def update_participant_count(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Keep ``EventModel.participant_count`` in step with the participation
+    table, whichever side of the relation (``user.events_joined`` or
+    ``event.participants``) the change was made from.
+    """
+    if action == "post_add":
+        # Django only reports the rows it actually inserted.
+        if reverse:
+            _adjust([instance.pk], len(pk_set))
+        else:
+            _adjust(pk_set, 1)
+
+    elif action in ("pre_remove", "pre_clear"):
+        # Removal reports the requested ids, not the rows that existed, so
+        # look up what is really about to go before it is deleted.
+        if reverse:
+            rows = Participation.objects.filter(eventmodel_id=instance.pk)
+            if action == "pre_remove":
+                rows = rows.filter(customuser_id__in=pk_set)
+            instance._participants_removed = rows.count()
+        else:
+            rows = Participation.objects.filter(customuser_id=instance.pk)
+            if action == "pre_remove":
+                rows = rows.filter(eventmodel_id__in=pk_set)
+            instance._events_removed = list(
+                rows.values_list("eventmodel_id", flat=True)
+            )
+
+    elif action in ("post_remove", "post_clear"):
+        if reverse:
+            _adjust([instance.pk], -instance.__dict__.pop("_participants_removed", 0))
+        else:
+            _adjust(instance.__dict__.pop("_events_removed", []), -1)
+
+
+@receiver(pre_delete, sender=CustomUser)
+def release_participation(sender, instance, **kwargs):
+    # Deleting a user cascades over the participation rows without sending
+    # m2m_changed.
+    event_ids = Participation.objects.filter(customuser_id=instance.pk).values_list(
+        "eventmodel_id", flat=True
+    )
+    event_ids = list(event_ids)
+    _adjust(event_ids, -1)
+    if event_ids:
+        bump_generation(EVENTS)
+
+
+@receiver(post_save, sender=EventModel)
+@receiver(post_delete, sender=EventModel)
+def invalidate_event_responses(sender, **kwargs):
+    bump_generation(EVENTS)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_responses(sender, **kwargs):
+    # Event bodies embed the category name.
+    bump_generation(EVENTS, CATEGORIES)
+
+
+@receiver(m2m_changed, sender=Participation)
+def invalidate_participation_responses(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_generation(EVENTS)
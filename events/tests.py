@@ -1,3 +1,1061 @@
-from django.test import TestCase
+import base64
+import csv
+import gzip
+import json
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from pathlib import Path
 
-# Create your tests here.
+from django.contrib.auth.models import Group
+from django.core.cache import caches
+from django.conf import settings
+from django.core.management import call_command
+from django.core.signals import request_started
+from django.db import connection, router, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.database import apply_sqlite_pragmas
+from api.query_budget import QueryBudgetExceeded
+from users.models import CustomUser
+from users.roles import GOVERNMENT_AUTHORITY
+from users.tokens import RoleRefreshToken
+from .cache import CATEGORIES, EVENTS, bump_generation, get_generation
+from .export import EXPORT_FIELDS
+from .facets import FACETS
+from .lifecycle import advance_event_statuses
+from .models import Category, EventModel
+from .pagination import EventCursorPagination
+from .registration import (
+    AlreadyRegistered,
+    EventFull,
+    RegistrationClosed,
+    register_participant,
+)
+from .views import ListEventView
+
+
+class EventQueryBudgetTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="resident@example.com", password="password"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.category = Category.objects.create(name="Education")
+        caches[settings.RESPONSE_CACHE_ALIAS].clear()
+
+    def create_events(self, count):
+        now = timezone.now()
+        # Run the cache invalidation hooks that would fire on commit.
+        with self.captureOnCommitCallbacks(execute=True):
+            for index in range(count):
+                event = EventModel.objects.create(
+                    event_name=f"Event {index}",
+                    event_hosts="Hosts",
+                    description="Description",
+                    image_url="https://example.com/event.jpg",
+                    event_date=now + timedelta(days=index),
+                    category=self.category,
+                    location="Town Hall",
+                    registration_deadline=now + timedelta(days=index),
+                    capacity=100,
+                )
+                event.participants.add(self.user)
+
+    def test_list_query_count_does_not_grow_with_rows(self):
+        self.create_events(2)
+        small = self.client.get(reverse("list-event"))
+        self.create_events(10)
+        large = self.client.get(reverse("list-event"))
+
+        self.assertEqual(large.status_code, 200)
+        self.assertEqual(large["X-Cache"], "MISS")
+        self.assertEqual(small["X-Query-Count"], large["X-Query-Count"])
+
+    def test_list_is_served_from_cache_until_events_change(self):
+        self.create_events(1)
+        self.client.get(reverse("list-event"))
+        cached = self.client.get(reverse("list-event"), {"unknown": "ignored"})
+        self.assertEqual(cached["X-Cache"], "HIT")
+        self.assertEqual(cached["X-Query-Count"], "0")
+
+        self.create_events(1)
+        refreshed = self.client.get(reverse("list-event"))
+        self.assertEqual(refreshed["X-Cache"], "MISS")
+        self.assertEqual(len(refreshed.data["results"]), 2)
+
+    def test_every_bump_sets_a_new_generation(self):
+        cache = caches[settings.RESPONSE_CACHE_ALIAS]
+        generations = [get_generation(EVENTS)]
+        # incr is a get then a set on the file and database backends.
+        with mock.patch.object(type(cache), "incr", side_effect=AssertionError):
+            for _ in range(2):
+                with self.captureOnCommitCallbacks(execute=True):
+                    bump_generation(EVENTS, CATEGORIES)
+                generations.append(get_generation(EVENTS))
+        self.assertEqual(len(set(generations)), 3)
+        self.assertEqual(get_generation(CATEGORIES), generations[-1])
+
+    def test_list_last_modified_moves_when_an_event_is_deleted(self):
+        self.create_events(3)
+        url = reverse("list-event")
+        last_modified = self.client.get(url)["Last-Modified"]
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code,
+            304,
+        )
+
+        # Not the latest event, so max(updated_at) stays where it was.
+        later = time.time_ns() + 2 * 10**9
+        with mock.patch("events.cache.time.time_ns", return_value=later):
+            with self.captureOnCommitCallbacks(execute=True):
+                EventModel.objects.order_by("updated_at").first().delete()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertNotEqual(response["Last-Modified"], last_modified)
+
+    def test_detail_prefetches_participants(self):
+        self.create_events(1)
+        event = EventModel.objects.get()
+        # Validators, the event, and its participants.
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("event-detail", args=[event.id]))
+        self.assertEqual(len(response.data["participants"]), 1)
+
+    def test_detail_answers_if_none_match_without_serializing(self):
+        self.create_events(1)
+        url = reverse("event-detail", args=[EventModel.objects.get().id])
+        etag = self.client.get(url)["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    @override_settings(QUERY_COUNT_HEADER=False)
+    def test_query_counts_are_only_sent_when_enabled(self):
+        self.create_events(1)
+        response = self.client.get(reverse("list-event"))
+        self.assertNotIn("X-Query-Count", response)
+        with self.settings(DEBUG=True):
+            response = self.client.get(reverse("list-event"))
+        self.assertEqual(response["X-Query-Count"], "0")
+
+    def test_over_budget_fails_in_strict_mode(self):
+        self.create_events(1)
+        budget = ListEventView.query_budget
+        ListEventView.query_budget = 0
+        try:
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse("list-event"))
+        finally:
+            ListEventView.query_budget = budget
+
+
+class EventCursorPaginationTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="resident@example.com", password="password"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        caches[settings.RESPONSE_CACHE_ALIAS].clear()
+        categories = [
+            Category.objects.create(name=name) for name in ("Music", "Art", "Sport")
+        ]
+        start = timezone.now() + timedelta(days=1)
+        # Pairs of events share a date, a name and a location, so every
+        # ordering has ties for the id tie-breaker to settle.
+        for index in range(9):
+            event_date = start + timedelta(days=index // 2)
+            EventModel.objects.create(
+                event_name=f"Event {index % 4}",
+                event_hosts="Hosts",
+                description="Description",
+                image_url="https://example.com/event.jpg",
+                event_date=event_date,
+                category=categories[index % 3],
+                location=f"Venue {index % 2}",
+                registration_deadline=event_date,
+                capacity=100,
+            )
+
+    def page(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def walk(self, ordering):
+        page = self.page(reverse("list-event"), {"ordering": ordering, "page_size": 2})
+        self.assertIsNone(page["previous"])
+        forward = [[event["id"] for event in page["results"]]]
+        while page["next"]:
+            page = self.page(page["next"])
+            forward.append([event["id"] for event in page["results"]])
+
+        backward = [forward[-1]]
+        while page["previous"]:
+            page = self.page(page["previous"])
+            backward.insert(0, [event["id"] for event in page["results"]])
+        self.assertEqual(backward, forward)
+        return [pk for ids in forward for pk in ids]
+
+    def test_every_ordering_pages_through_ties(self):
+        for ordering in ListEventView.ordering_fields:
+            if ordering == "distance_km":
+                continue
+            for direction in ("", "-"):
+                with self.subTest(ordering=direction + ordering):
+                    tie_breaker = "-id" if direction else "id"
+                    expected = list(
+                        EventModel.objects.order_by(
+                            direction + ordering, tie_breaker
+                        ).values_list("pk", flat=True)
+                    )
+                    self.assertEqual(self.walk(direction + ordering), expected)
+
+    def test_invalid_cursors_are_bad_requests(self):
+        def encode(payload):
+            raw = json.dumps(payload).encode()
+            return base64.urlsafe_b64encode(raw).decode()
+
+        now = timezone.now().isoformat()
+        for cursor in [
+            "not base64!",
+            "é",
+            base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+            encode("a string"),
+            encode({"o": ["event_date", "id"]}),
+            encode({"o": ["event_name", "id"], "p": ["Event 1", 1]}),
+            encode({"o": ["event_date", "id"], "p": [now]}),
+            encode({"o": ["event_date", "id"], "p": ["yesterday", 1]}),
+            encode({"o": ["event_date", "id"], "p": [now, "one"]}),
+        ]:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(reverse("list-event"), {"cursor": cursor})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data, {"detail": "Invalid cursor"})
+
+    @mock.patch.multiple(EventCursorPagination, page_size=4, max_page_size=5)
+    def test_page_size_is_capped(self):
+        for page_size, expected in [(None, 4), (3, 3), (50, 5), (0, 4), ("x", 4)]:
+            with self.subTest(page_size=page_size):
+                params = {} if page_size is None else {"page_size": page_size}
+                page = self.page(reverse("list-event"), params)
+                self.assertEqual(len(page["results"]), expected)
+
+
+class RegistrationEngineTest(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.event = EventModel.objects.create(
+            event_name="Workshop",
+            event_hosts="Hosts",
+            description="Description",
+            image_url="https://example.com/event.jpg",
+            event_date=now + timedelta(days=7),
+            category=Category.objects.create(name="Education"),
+            location="Town Hall",
+            registration_deadline=now + timedelta(days=6),
+            capacity=1,
+        )
+        self.first = CustomUser.objects.create_user(email="first@example.com")
+        self.second = CustomUser.objects.create_user(email="second@example.com")
+
+    def test_registration_returns_new_count(self):
+        self.assertEqual(register_participant(self.event.pk, self.first), 1)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participant_count, 1)
+        self.assertEqual(self.event.participants.get(), self.first)
+
+    def test_duplicate_registration_does_not_take_a_seat(self):
+        self.event.capacity = 2
+        self.event.save()
+        register_participant(self.event.pk, self.first)
+        with self.assertRaises(AlreadyRegistered):
+            register_participant(self.event.pk, self.first)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participant_count, 1)
+
+    def test_full_event_rejects(self):
+        register_participant(self.event.pk, self.first)
+        with self.assertRaises(EventFull):
+            register_participant(self.event.pk, self.second)
+
+    def test_closed_event_rejects(self):
+        self.event.registration_deadline = timezone.now() - timedelta(minutes=1)
+        self.event.save()
+        with self.assertRaises(RegistrationClosed):
+            register_participant(self.event.pk, self.first)
+
+
+class ParticipantCountTest(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        category = Category.objects.create(name="Education")
+        self.first, self.second = (
+            EventModel.objects.create(
+                event_name=name,
+                event_hosts="Hosts",
+                description="Description",
+                image_url="https://example.com/event.jpg",
+                event_date=now + timedelta(days=7),
+                category=category,
+                location="Town Hall",
+                registration_deadline=now + timedelta(days=6),
+                capacity=10,
+            )
+            for name in ("Workshop", "Lecture")
+        )
+        self.alice, self.bob, self.carol = (
+            CustomUser.objects.create_user(email=f"{name}@example.com")
+            for name in ("alice", "bob", "carol")
+        )
+
+    def counts(self):
+        return [
+            EventModel.objects.get(pk=event.pk).participant_count
+            for event in (self.first, self.second)
+        ]
+
+    def test_adding_from_either_side(self):
+        self.first.participants.add(self.alice, self.bob)
+        self.assertEqual(self.counts(), [2, 0])
+        self.carol.events_joined.add(self.first, self.second)
+        self.assertEqual(self.counts(), [3, 1])
+        # Rows that already exist are not inserted again, nor counted.
+        self.first.participants.add(self.alice)
+        self.alice.events_joined.add(self.first)
+        self.assertEqual(self.counts(), [3, 1])
+
+    def test_removing_from_either_side(self):
+        self.first.participants.add(self.alice, self.bob, self.carol)
+        self.second.participants.add(self.alice)
+        self.first.participants.remove(self.alice, self.bob)
+        self.assertEqual(self.counts(), [1, 1])
+        self.alice.events_joined.remove(self.first, self.second)
+        self.assertEqual(self.counts(), [1, 0])
+        # Removing someone who never joined changes nothing.
+        self.first.participants.remove(self.bob)
+        self.bob.events_joined.remove(self.second)
+        self.assertEqual(self.counts(), [1, 0])
+
+    def test_clearing_from_either_side(self):
+        self.first.participants.add(self.alice, self.bob)
+        self.carol.events_joined.add(self.first, self.second)
+        self.first.participants.clear()
+        self.assertEqual(self.counts(), [0, 1])
+        self.carol.events_joined.clear()
+        self.assertEqual(self.counts(), [0, 0])
+
+    def test_deleting_a_user_releases_their_seats(self):
+        self.alice.events_joined.add(self.first, self.second)
+        self.bob.events_joined.add(self.first)
+        self.alice.delete()
+        self.assertEqual(self.counts(), [1, 0])
+
+    def test_reconcile_fixes_drifted_counts(self):
+        self.first.participants.add(self.alice, self.bob)
+        EventModel.objects.filter(pk=self.first.pk).update(participant_count=7)
+        EventModel.objects.filter(pk=self.second.pk).update(participant_count=3)
+
+        out = StringIO()
+        call_command("reconcile_participant_counts", dry_run=True, stdout=out)
+        self.assertIn(f"Event {self.first.pk}: stored 7, actual 2", out.getvalue())
+        self.assertIn("Found 2 drifted event(s)", out.getvalue())
+        self.assertEqual(self.counts(), [7, 3])
+
+        out = StringIO()
+        call_command("reconcile_participant_counts", batch_size=1, stdout=out)
+        self.assertIn("Fixed 2 drifted event(s)", out.getvalue())
+        self.assertEqual(self.counts(), [2, 0])
+
+
+class BulkCreateEventsTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email="officer@example.com")
+        self.user.groups.add(Group.objects.create(name=GOVERNMENT_AUTHORITY))
+        # The token's roles claim keeps the permission check off the database.
+        token = RoleRefreshToken.for_user(self.user).access_token
+        self.client = APIClient()
+        self.client.force_authenticate(self.user, token=token)
+        self.music = Category.objects.create(name="Music")
+        self.sport = Category.objects.create(name="Sport")
+
+    def item(self, index=0, category=None):
+        date = (timezone.now() + timedelta(days=index + 1)).isoformat()
+        return {
+            "event_name": f"Event {index}",
+            "event_hosts": "Hosts",
+            "description": "Description",
+            "image_url": "https://example.com/event.jpg",
+            "event_date": date,
+            "category": (category or self.music).pk,
+            "location": "Town Hall",
+            "registration_deadline": date,
+            "capacity": 100,
+        }
+
+    def post(self, items):
+        return self.client.post(reverse("add-event"), items, format="json")
+
+    def test_invalid_items_are_reported_by_index(self):
+        items = [
+            self.item(0),
+            {"event_name": "Incomplete"},
+            "not an object",
+            self.item(3, category=Category(pk=0)),
+            self.item(4, category=self.sport),
+        ]
+        # Categories, then the insert inside its savepoint.
+        with self.assertNumQueries(4):
+            response = self.post(items)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [event["category_name"] for event in response.data["created"]],
+            ["Music", "Sport"],
+        )
+        self.assertEqual(
+            [error["index"] for error in response.data["errors"]], [1, 2, 3]
+        )
+        self.assertIn("event_date", response.data["errors"][0]["errors"])
+        self.assertEqual(
+            response.data["errors"][1]["errors"],
+            {"non_field_errors": ["Expected an object."]},
+        )
+        self.assertEqual(list(response.data["errors"][2]["errors"]), ["category"])
+        self.assertEqual(EventModel.objects.count(), 2)
+
+    def test_categories_are_looked_up_once(self):
+        items = [
+            self.item(index, category=(self.music, self.sport)[index % 2])
+            for index in range(20)
+        ]
+        with self.assertNumQueries(4):
+            response = self.post(items)
+        self.assertEqual(len(response.data["created"]), 20)
+        self.assertEqual(response.data["errors"], [])
+
+    def test_nothing_valid_is_a_bad_request(self):
+        with self.assertNumQueries(1):
+            response = self.post(
+                [{"event_name": "Incomplete", "category": self.music.pk}]
+            )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["created"], [])
+        self.assertEqual(response.data["errors"][0]["index"], 0)
+
+    def test_ndjson_body(self):
+        body = "\n".join(
+            [json.dumps(self.item(0)), "", json.dumps(self.item(1, self.sport))]
+        )
+        response = self.client.post(
+            reverse("add-event"), body, content_type="application/x-ndjson"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data["created"]), 2)
+
+        response = self.client.post(
+            reverse("add-event"),
+            json.dumps(self.item(0)) + "\n{not json",
+            content_type="application/x-ndjson",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("line 2", str(response.data))
+        self.assertEqual(EventModel.objects.count(), 2)
+
+    @override_settings(EVENT_BULK_CREATE_MAX_ITEMS=2)
+    def test_batches_are_capped(self):
+        with self.assertNumQueries(0):
+            response = self.post([self.item(index) for index in range(3)])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {"error": "At most 2 events per request"})
+        self.assertFalse(EventModel.objects.exists())
+
+
+class EventExportTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email="officer@example.com")
+        self.user.groups.add(Group.objects.create(name=GOVERNMENT_AUTHORITY))
+        token = RoleRefreshToken.for_user(self.user).access_token
+        self.client = APIClient()
+        self.client.force_authenticate(self.user, token=token)
+        music = Category.objects.create(name="Music")
+        sport = Category.objects.create(name="Sport")
+        now = timezone.now()
+        self.events = [
+            EventModel.objects.create(
+                event_name=name,
+                event_hosts="Hosts",
+                description="Description, with a comma",
+                image_url="https://example.com/event.jpg",
+                event_date=now + timedelta(days=index + 1),
+                category=category,
+                location=location,
+                registration_deadline=now + timedelta(days=index),
+                capacity=100,
+            )
+            for index, (name, category, location) in enumerate(
+                [
+                    ("Concert", music, "Park"),
+                    ("Marathon", sport, "Park"),
+                    ("Opera", music, "Hall"),
+                ]
+            )
+        ]
+
+    def export(self, **params):
+        response = self.client.get(reverse("export-events"), params)
+        self.assertEqual(response.status_code, 200)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_ndjson(self):
+        response, body = self.export()
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(
+            response["Content-Disposition"], 'attachment; filename="events.ndjson"'
+        )
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row["id"] for row in rows], [e.pk for e in self.events])
+        self.assertEqual(list(rows[0]), EXPORT_FIELDS)
+        self.assertEqual(rows[0]["category_name"], "Music")
+        self.assertEqual(
+            rows[0]["event_date"],
+            timezone.localtime(self.events[0].event_date).isoformat(),
+        )
+
+    def test_csv(self):
+        response, body = self.export(output="csv")
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.reader(StringIO(body)))
+        self.assertEqual(rows[0], EXPORT_FIELDS)
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(
+            rows[1][EXPORT_FIELDS.index("description")], "Description, with a comma"
+        )
+
+    def test_list_filters_apply(self):
+        _, body = self.export(category="music", location="park")
+        self.assertEqual(
+            [json.loads(line)["event_name"] for line in body.splitlines()],
+            ["Concert"],
+        )
+        _, body = self.export(output="csv", location="park")
+        self.assertEqual(len(body.splitlines()), 3)
+
+    def test_unknown_output_is_rejected(self):
+        response = self.client.get(reverse("export-events"), {"output": "xml"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_residents_cannot_export(self):
+        client = APIClient()
+        client.force_authenticate(
+            CustomUser.objects.create_user(email="resident@example.com")
+        )
+        self.assertEqual(client.get(reverse("export-events")).status_code, 403)
+
+
+class EventLifecycleTest(TestCase):
+    def test_statuses_advance_by_event_date(self):
+        now = timezone.now()
+        category = Category.objects.create(name="Education")
+        offsets = {
+            "future": timedelta(days=1),
+            "started": -timedelta(hours=1),
+            "finished": -settings.EVENT_ONGOING_DURATION - timedelta(hours=1),
+            "canceled": -timedelta(days=30),
+        }
+        for name, offset in offsets.items():
+            EventModel.objects.create(
+                event_name=name,
+                event_hosts="Hosts",
+                description="Description",
+                image_url="https://example.com/event.jpg",
+                event_date=now + offset,
+                category=category,
+                location="Town Hall",
+                registration_deadline=now + offset,
+                capacity=10,
+                status=(
+                    EventModel.CANCELED if name == "canceled" else EventModel.UPCOMING
+                ),
+            )
+
+        moved = advance_event_statuses(now=now, batch_size=1)
+
+        self.assertEqual(moved, {"ongoing": 1, "completed": 1})
+        self.assertEqual(
+            dict(EventModel.objects.values_list("event_name", "status")),
+            {
+                "future": EventModel.UPCOMING,
+                "started": EventModel.ONGOING,
+                "finished": EventModel.COMPLETED,
+                "canceled": EventModel.CANCELED,
+            },
+        )
+        self.assertEqual(
+            advance_event_statuses(now=now), {"ongoing": 0, "completed": 0}
+        )
+
+
+class PrecompiledSchemaTest(TestCase):
+    def test_built_schema_is_served_compressed_with_etag(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "schema.yml"
+            path.write_bytes(b"openapi: 3.0.3\n")
+            Path(f"{path}.gz").write_bytes(gzip.compress(path.read_bytes()))
+
+            with override_settings(SCHEMA_FILE=path):
+                response = self.client.get(
+                    reverse("schema"), HTTP_ACCEPT_ENCODING="gzip, deflate"
+                )
+                self.assertEqual(response["Content-Encoding"], "gzip")
+                self.assertEqual(gzip.decompress(response.content), b"openapi: 3.0.3\n")
+
+                with self.assertNumQueries(0):
+                    cached = self.client.get(
+                        reverse("schema"),
+                        HTTP_ACCEPT_ENCODING="gzip",
+                        HTTP_IF_NONE_MATCH=response["ETag"],
+                    )
+                self.assertEqual(cached.status_code, 304)
+
+
+class SeedDataTest(TestCase):
+    def test_seeded_counts_match_participation_rows(self):
+        call_command(
+            "seed_data",
+            users=30,
+            events=12,
+            registrations=120,
+            seed=7,
+            batch_size=5,
+            stdout=StringIO(),
+        )
+
+        users = CustomUser.objects.filter(email__startswith="seed-7-")
+        self.assertEqual(users.count(), 30)
+        self.assertEqual(users.filter(groups__name="Residents").count(), 30)
+        Participation = CustomUser.events_joined.through
+        for event in EventModel.objects.all():
+            self.assertEqual(
+                event.participant_count,
+                Participation.objects.filter(eventmodel=event).count(),
+            )
+            self.assertLessEqual(event.participant_count, event.capacity)
+
+
+class SqlitePragmaTest(TestCase):
+    def read_pragmas(self, names):
+        values = {}
+        with connection.cursor() as cursor:
+            for name in names:
+                cursor.execute(f"PRAGMA {name}")
+                values[name] = cursor.fetchone()[0]
+        return values
+
+    def apply_pragmas(self, pragmas):
+        with mock.patch.dict(connection.settings_dict, {"PRAGMAS": pragmas}):
+            apply_sqlite_pragmas(sender=None, connection=connection)
+
+    def test_configured_pragmas_are_applied_to_new_connections(self):
+        pragmas = {"cache_size": -2048, "busy_timeout": 1234}
+        # The test connection is shared by the whole suite; put it back.
+        self.addCleanup(self.apply_pragmas, self.read_pragmas(pragmas))
+
+        self.apply_pragmas(pragmas)
+        self.assertEqual(self.read_pragmas(pragmas), pragmas)
+
+
+@override_settings(DATABASE_REPLICA_ALIASES=["replica"])
+class ReplicaRoutingTest(TransactionTestCase):
+    # A TestCase would hold a transaction open, which pins reads to default.
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="resident@example.com", password="password"
+        )
+        # The replica is its own SQLite file; this event exists only there.
+        category = Category.objects.using("replica").create(name="Replicated")
+        self.event = EventModel.objects.using("replica").create(
+            event_name="Replicated event",
+            event_hosts="Hosts",
+            description="Description",
+            image_url="https://example.com/event.jpg",
+            event_date=timezone.now() + timedelta(days=1),
+            category=category,
+            location="Town Hall",
+            registration_deadline=timezone.now() + timedelta(days=1),
+            capacity=100,
+        )
+        request_started.send(sender=None)
+
+    def test_event_reads_use_replica_until_the_request_writes(self):
+        self.assertEqual(router.db_for_read(EventModel), "replica")
+        self.assertEqual(router.db_for_read(CustomUser), "default")
+        self.assertTrue(EventModel.objects.filter(pk=self.event.pk).exists())
+
+        with transaction.atomic():
+            self.assertEqual(router.db_for_read(EventModel), "default")
+
+        self.assertEqual(router.db_for_write(EventModel), "default")
+        self.assertEqual(router.db_for_read(EventModel), "default")
+        self.assertFalse(EventModel.objects.filter(pk=self.event.pk).exists())
+
+        request_started.send(sender=None)
+        self.assertEqual(router.db_for_read(EventModel), "replica")
+
+    def test_queries_are_counted_per_alias(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get(reverse("event-detail", args=[self.event.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["event_name"], "Replicated event")
+        counts = dict(
+            part.split("=") for part in response["X-Query-Count-By-Alias"].split(", ")
+        )
+        self.assertEqual(counts["default"], "0")
+        self.assertGreater(int(counts["replica"]), 0)
+
+    def test_response_cache_is_filled_from_primary_after_a_change(self):
+        caches[settings.RESPONSE_CACHE_ALIAS].clear()
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        def listed():
+            request_started.send(sender=None)
+            response = client.get(reverse("list-event"))
+            return [event["event_name"] for event in response.data["results"]]
+
+        # The replicated event is missing on the primary.
+        bump_generation(EVENTS)
+        self.assertEqual(listed(), [])
+        with override_settings(DATABASE_REPLICA_MAX_LAG=0):
+            bump_generation(EVENTS)
+            self.assertEqual(listed(), ["Replicated event"])
+
+
+class AsyncEventViewTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="resident@example.com", password="password"
+        )
+        token = RoleRefreshToken.for_user(self.user).access_token
+        self.auth = {"Authorization": f"Bearer {token}"}
+        category = Category.objects.create(name="Education")
+        now = timezone.now()
+        self.events = [
+            EventModel.objects.create(
+                event_name=f"Event {index}",
+                event_hosts="Hosts",
+                description="Description",
+                image_url="https://example.com/event.jpg",
+                event_date=now + timedelta(days=index + 1),
+                category=category,
+                location="Town Hall",
+                registration_deadline=now + timedelta(days=index + 1),
+                capacity=1,
+            )
+            for index in range(3)
+        ]
+        caches[settings.RESPONSE_CACHE_ALIAS].clear()
+
+    @override_settings(JWT_STATELESS_AUTH=True)
+    async def test_list_matches_sync_view(self):
+        response = await self.async_client.get(
+            reverse("async-list-event"), {"page_size": 2}, headers=self.auth
+        )
+        sync_response = await self.async_client.get(
+            reverse("list-event"), {"page_size": 2}, headers=self.auth
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["results"], sync_response.json()["results"])
+        self.assertIn("cursor=", response.json()["next"])
+
+        cached = await self.async_client.get(
+            reverse("async-list-event"),
+            {"page_size": 2},
+            headers={**self.auth, "If-None-Match": response["ETag"]},
+        )
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached["X-Query-Count"], "0")
+
+    async def test_requires_a_bearer_token(self):
+        response = await self.async_client.get(reverse("async-list-event"))
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("WWW-Authenticate", response)
+
+    async def test_detail_and_registration(self):
+        event = self.events[0]
+        detail = reverse("async-event-detail", args=[event.pk])
+        register = reverse("async-register-event", args=[event.pk])
+
+        response = await self.async_client.get(detail, headers=self.auth)
+        self.assertEqual(response.json()["participants"], [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = await self.async_client.post(register, headers=self.auth)
+        self.assertEqual(response.json()["total_participants"], 1)
+        response = await self.async_client.post(register, headers=self.auth)
+        self.assertEqual(response.status_code, 400)
+
+        response = await self.async_client.get(detail, headers=self.auth)
+        self.assertEqual(response.json()["participants"][0]["id"], self.user.pk)
+        missing = reverse("async-event-detail", args=[0])
+        response = await self.async_client.get(missing, headers=self.auth)
+        self.assertEqual(response.status_code, 404)
+
+
+class NearbyEventsTest(TestCase):
+    # (name, latitude, longitude): about 0, 9, 13 and 340 km from Trafalgar Square.
+    PLACES = [
+        ("Trafalgar Square", 51.5080, -0.1281),
+        ("Greenwich", 51.4826, -0.0077),
+        ("Richmond", 51.4613, -0.3037),
+        ("Paris", 48.8566, 2.3522),
+    ]
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="resident@example.com", password="password"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        caches[settings.RESPONSE_CACHE_ALIAS].clear()
+        category = Category.objects.create(name="Outdoors")
+        now = timezone.now()
+        for index, (name, latitude, longitude) in enumerate(self.PLACES):
+            EventModel.objects.create(
+                event_name=name,
+                event_hosts="Hosts",
+                description="Description",
+                image_url="https://example.com/event.jpg",
+                # Date order is the reverse of distance order.
+                event_date=now + timedelta(days=10 - index),
+                category=category,
+                location=name,
+                registration_deadline=now + timedelta(days=1),
+                capacity=100,
+                latitude=latitude,
+                longitude=longitude,
+            )
+
+    def test_near_filters_by_radius_and_orders_by_distance(self):
+        params = {"near": "51.5080,-0.1281", "radius_km": 20}
+        by_date = self.client.get(reverse("list-event"), params)
+        self.assertEqual(
+            [event["event_name"] for event in by_date.data["results"]],
+            ["Richmond", "Greenwich", "Trafalgar Square"],
+        )
+
+        params.update(ordering="distance_km", page_size=2)
+        first = self.client.get(reverse("list-event"), params)
+        results = first.data["results"]
+        self.assertEqual(
+            [event["event_name"] for event in results],
+            ["Trafalgar Square", "Greenwich"],
+        )
+        self.assertAlmostEqual(results[1]["distance_km"], 8.8, delta=0.5)
+        second = self.client.get(first.data["next"])
+        self.assertEqual(
+            [event["event_name"] for event in second.data["results"]], ["Richmond"]
+        )
+
+    def test_distance_needs_near(self):
+        response = self.client.get(reverse("list-event"), {"ordering": "distance_km"})
+        self.assertEqual(len(response.data["results"]), 4)
+        self.assertNotIn("distance_km", response.data["results"][0])
+        self.assertEqual(
+            self.client.get(reverse("list-event"), {"near": "91,0"}).status_code, 400
+        )
+
+    def test_grid_cell_follows_coordinates(self):
+        event = EventModel.objects.get(event_name="Paris")
+        event.latitude, event.longitude = 51.4826, -0.0077
+        event.save(update_fields=["latitude", "longitude"])
+        response = self.client.get(
+            reverse("list-event"), {"near": "51.5080,-0.1281", "radius_km": 10}
+        )
+        self.assertIn(
+            "Paris", [event["event_name"] for event in response.data["results"]]
+        )
+
+
+class EventCalendarTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="resident@example.com", password="password"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        caches[settings.RESPONSE_CACHE_ALIAS].clear()
+        category = Category.objects.create(name="Music")
+        # Local (Asia/Hong_Kong) times; 00:30 on Sep 2 is still Sep 1 in UTC.
+        for local_time in [
+            "2024-08-31 23:00",
+            "2024-09-01 10:00",
+            "2024-09-02 00:30",
+            "2024-09-02 18:00",
+            "2024-10-01 00:00",
+        ]:
+            event_date = timezone.make_aware(
+                timezone.datetime.fromisoformat(local_time)
+            )
+            EventModel.objects.create(
+                event_name="Concert",
+                event_hosts="Hosts",
+                description="Description",
+                image_url="https://example.com/event.jpg",
+                event_date=event_date,
+                category=category,
+                location="Park",
+                registration_deadline=event_date,
+                capacity=100,
+            )
+
+    def test_from_and_to_bound_local_days(self):
+        response = self.client.get(
+            reverse("list-event"), {"from": "2024-09-01", "to": "2024-09-30"}
+        )
+        self.assertEqual(len(response.data["results"]), 3)
+
+    def test_counts_per_local_day_and_month(self):
+        url = reverse("event-calendar")
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {"from": "2024-09-01", "to": "2024-10-31"})
+        self.assertEqual(
+            response.data,
+            [
+                {"date": "2024-09-01", "count": 1},
+                {"date": "2024-09-02", "count": 2},
+                {"date": "2024-10-01", "count": 1},
+            ],
+        )
+        with self.assertNumQueries(0):
+            cached = self.client.get(url, {"from": "2024-09-01", "to": "2024-10-31"})
+        self.assertEqual(cached["X-Cache"], "HIT")
+
+        response = self.client.get(
+            url, {"from": "2024-08-01", "to": "2024-10-31", "period": "month"}
+        )
+        self.assertEqual(
+            response.data,
+            [
+                {"date": "2024-08-01", "count": 1},
+                {"date": "2024-09-01", "count": 3},
+                {"date": "2024-10-01", "count": 1},
+            ],
+        )
+
+    def test_fits_its_budget_with_a_bearer_token(self):
+        token = RoleRefreshToken.for_user(self.user).access_token
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        response = client.get(
+            reverse("event-calendar"), {"from": "2024-09-01", "to": "2024-10-31"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response["X-Query-Count"], "2")
+
+    def test_range_is_required_and_bounded(self):
+        url = reverse("event-calendar")
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(
+            self.client.get(
+                url, {"from": "2024-09-02", "to": "2024-09-01"}
+            ).status_code,
+            400,
+        )
+        self.assertEqual(
+            self.client.get(
+                url, {"from": "2000-01-01", "to": "2024-09-01"}
+            ).status_code,
+            400,
+        )
+
+
+class EventFacetsTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="resident@example.com", password="password"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        caches[settings.RESPONSE_CACHE_ALIAS].clear()
+        now = timezone.now()
+        music = Category.objects.create(name="Music")
+        sport = Category.objects.create(name="Sport")
+        for name, category, location, status in [
+            ("Jazz Night", music, "Park", EventModel.UPCOMING),
+            ("Jazz Brunch", music, "Hall", EventModel.UPCOMING),
+            ("Jazz Run", sport, "Park", EventModel.CANCELED),
+            ("Marathon", sport, "Park", EventModel.UPCOMING),
+        ]:
+            EventModel.objects.create(
+                event_name=name,
+                event_hosts="Hosts",
+                description="Description",
+                image_url="https://example.com/event.jpg",
+                event_date=now + timedelta(days=1),
+                category=category,
+                location=location,
+                registration_deadline=now,
+                capacity=100,
+                status=status,
+            )
+
+    def test_counts_follow_search_and_filters(self):
+        url = reverse("event-facets")
+        with self.assertNumQueries(3):
+            response = self.client.get(url, {"search": "jazz"})
+        self.assertEqual(
+            response.data,
+            {
+                "category": [
+                    {"value": "Music", "count": 2},
+                    {"value": "Sport", "count": 1},
+                ],
+                "status": [
+                    {"value": "UPCOMING", "count": 2},
+                    {"value": "CANCELED", "count": 1},
+                ],
+                "location": [
+                    {"value": "Park", "count": 2},
+                    {"value": "Hall", "count": 1},
+                ],
+            },
+        )
+        with self.assertNumQueries(0):
+            cached = self.client.get(url, {"search": "jazz"})
+        self.assertEqual(cached["X-Cache"], "HIT")
+
+        response = self.client.get(
+            url, {"facets": "location", "facet_limit": 1, "category": "sport"}
+        )
+        self.assertEqual(response.data, {"location": [{"value": "Park", "count": 2}]})
+
+    def test_fits_its_budget_with_a_bearer_token(self):
+        token = RoleRefreshToken.for_user(self.user).access_token
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        response = client.get(reverse("event-facets"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response["X-Query-Count"], str(len(FACETS) + 1))
+
+    def test_rejects_unknown_facets(self):
+        response = self.client.get(reverse("event-facets"), {"facets": "hosts"})
+        self.assertEqual(response.status_code, 400)
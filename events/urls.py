@@ -1,6 +1,10 @@
 from django.urls import path, include
 from .views import *
-
+from .async_views import (
+    AsyncEventDetailView,
+    AsyncEventRegistrationView,
+    AsyncListEventView,
+)
 
 urlpatterns = [
     path("", EventView.as_view(), name="add-event"),
@@ -16,4 +20,20 @@ urlpatterns = [
     path(
         "event-detail/<int:event_id>/", EventDetailView.as_view(), name="event-detail"
     ),
+    path("calendar/", EventCalendarView.as_view(), name="event-calendar"),
+    path("facets/", EventFacetsView.as_view(), name="event-facets"),
+    path("export/", EventExportView.as_view(), name="export-events"),
+    path("cache-metrics/", ResponseCacheMetricsView.as_view(), name="cache-metrics"),
+    # Native async versions of the read and registration paths, for ASGI
+    path("async/event-list/", AsyncListEventView.as_view(), name="async-list-event"),
+    path(
+        "async/register-event/<int:event_id>/",
+        AsyncEventRegistrationView.as_view(),
+        name="async-register-event",
+    ),
+    path(
+        "async/event-detail/<int:event_id>/",
+        AsyncEventDetailView.as_view(),
+        name="async-event-detail",
+    ),
 ]
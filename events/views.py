@@ -1,15 +1,22 @@
 from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from django.conf import settings
+from django.db.models import Count, DateField, Max
+from django.db.models.functions import Trunc
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from .models import Category, EventModel
 from .serializers import (
     CategorySerializer,
     EventSerializer,
+    EventCalendarSerializer,
+    EventFacetsSerializer,
     ErrorSerializer,
     EventDetailSerializer,
     EventRegistrationResponseSerializer,
 )
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import (
     extend_schema,
     extend_schema_view,
@@ -24,10 +31,29 @@ from .openapi_examples import (
     delete_category_error_example,
     forbidden_example,
 )
-from .filters import EventFilter
-from rest_framework.filters import SearchFilter, OrderingFilter
+from .filters import EventCalendarFilter, EventFilter, EventOrderingFilter
+from .pagination import EventCursorPagination
+from .registration import RegistrationError, register_participant
+from .cache import (
+    CATEGORIES,
+    EVENTS,
+    CachedListMixin,
+    get_cache,
+    get_generation,
+    metrics,
+    read_primary_if_changed,
+)
+from .conditional import ConditionalGetMixin, make_etag
+from .export import EXPORT_FORMATS, buffered, export_rows
+from .facets import FACETS, facet_counts
+from .bulk import bulk_create_events
+from .parsers import NDJSONParser
+from rest_framework.settings import api_settings
+from rest_framework.filters import SearchFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from users.permission import IsGovernmentAuthority
+from api.querysets import optimize_for_serializer
+from api.query_budget import query_budget
 
 
 @extend_schema_view(
@@ -47,7 +73,9 @@ from users.permission import IsGovernmentAuthority
         examples=[list_categories_example],
     )
 )
-class CategoryListView(generics.ListAPIView):
+@query_budget(4)
+class CategoryListView(CachedListMixin, generics.ListAPIView):
+    cache_namespace = CATEGORIES
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsGovernmentAuthority]
@@ -131,7 +159,7 @@ class CategoryDeleteView(generics.DestroyAPIView):
         403: ErrorSerializer,
     },
     summary="Create a new event",
-    description="This endpoint allows an admin user only to create a new event.",
+    description="This endpoint allows an admin user only to create a new event. Send a JSON array (or an `application/x-ndjson` body) to create many events in one request: valid items are inserted in batches, and invalid ones are reported by index in `errors` without aborting the rest.",
     examples=[
         OpenApiExample(
             "Create Event Example",
@@ -151,16 +179,69 @@ class CategoryDeleteView(generics.DestroyAPIView):
             request_only=True,
             response_only=False,
         ),
+        OpenApiExample(
+            "Bulk Create Response Example",
+            value={
+                "created": [
+                    {
+                        "id": 1,
+                        "category_name": "Education",
+                        "event_name": "Annual Tech Conference",
+                        "event_hosts": "Tech Innovators Inc.",
+                        "description": "A conference for technology enthusiasts to explore new trends.",
+                        "image_url": "https://example.com/images/tech-conference.jpg",
+                        "event_date": "2024-09-15T09:00:00Z",
+                        "category": 1,
+                        "location": "Tech Convention Center, Silicon Valley",
+                        "registration_deadline": "2024-09-01T23:59:59Z",
+                        "capacity": 500,
+                        "status": "UPCOMING",
+                    }
+                ],
+                "errors": [
+                    {
+                        "index": 1,
+                        "errors": {
+                            "category": ['Invalid pk "99" - object does not exist.']
+                        },
+                    }
+                ],
+            },
+            request_only=False,
+            response_only=True,
+        ),
     ],
 )
 class EventView(generics.CreateAPIView):
     queryset = EventModel.objects.all()
     serializer_class = EventSerializer
     permission_classes = [IsAuthenticated, IsGovernmentAuthority]
+    parser_classes = [*api_settings.DEFAULT_PARSER_CLASSES, NDJSONParser]
 
     def post(self, request, *args, **kwargs):
+        if isinstance(request.data, list):
+            return self.bulk_create(request)
         return super().post(request, *args, **kwargs)
 
+    def bulk_create(self, request):
+        items = request.data
+        if len(items) > settings.EVENT_BULK_CREATE_MAX_ITEMS:
+            return Response(
+                {
+                    "error": f"At most {settings.EVENT_BULK_CREATE_MAX_ITEMS} events per request"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        created, errors = bulk_create_events(items)
+        return Response(
+            {
+                "created": self.get_serializer(created, many=True).data,
+                "errors": errors,
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST,
+        )
+
 
 @extend_schema(
     tags=["Events"],
@@ -215,31 +296,66 @@ class EventView(generics.CreateAPIView):
         ),
     ],
 )
-class ListEventView(generics.ListAPIView):
+@query_budget(4)
+class ListEventView(ConditionalGetMixin, CachedListMixin, generics.ListAPIView):
+    cache_namespace = EVENTS
     serializer_class = EventSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SearchFilter, EventOrderingFilter]
     filterset_class = EventFilter
     search_fields = ["event_name", "location", "event_date", "category__name"]
-    ordering_fields = ["event_name", "event_date", "location", "category__name"]
+    ordering_fields = [
+        "event_name",
+        "event_date",
+        "location",
+        "category__name",
+        "distance_km",
+    ]
+    ordering = ["event_date"]
+    pagination_class = EventCursorPagination
 
     def get_queryset(self):
-        queryset = EventModel.objects.all()
-        return self.filter_queryset(queryset)
-
-    def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
+        return optimize_for_serializer(
+            EventModel.objects.all(), self.get_serializer_class()
+        )
 
-        if not queryset.exists():
-            return Response({"detail": "Not Found"}, status=status.HTTP_404_NOT_FOUND)
+    validator_stats = {"last_modified": Max("updated_at"), "total": Count("pk")}
 
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+    def get_validators(self, request, *args, **kwargs):
+        # Validators live in the response cache next to the body, so a poll
+        # between two changes costs no query at all.
+        cache = get_cache()
+        generation = get_generation(EVENTS)
+        key = f"{self.get_cache_key(request, generation)}:validators"
+        validators = cache.get(key)
+        if validators is None:
+            read_primary_if_changed()
+            stats = (
+                self.filter_queryset(self.get_queryset())
+                .order_by()
+                .aggregate(**self.validator_stats)
+            )
+            validators = self.make_validators(
+                request, stats, generation, get_generation(CATEGORIES)
+            )
+            cache.set(key, validators, settings.RESPONSE_CACHE_TIMEOUT)
+        return validators
 
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+    def make_validators(self, request, stats, generation, categories_generation):
+        last_modified = stats["last_modified"]
+        etag = make_etag(
+            self.get_cache_fingerprint(request),
+            stats["total"],
+            last_modified.isoformat() if last_modified else "",
+            # Event bodies embed category names.
+            categories_generation,
+        )
+        # Deleting an event or renaming a category leaves max(updated_at)
+        # behind, but bumps the generation, which is the time of the change.
+        changed_at = generation / 10**9
+        if last_modified is not None:
+            changed_at = max(changed_at, last_modified.timestamp())
+        return etag, int(changed_at)
 
 
 @extend_schema(
@@ -262,35 +378,19 @@ class ListEventView(generics.ListAPIView):
         )
     ],
     summary="Register for an Event",
-    description="This endpoint allows an authenticated user to register for an event by providing the event ID in the URL path. It ensures that the user can only register once and checks if the event has reached its capacity.",
+    description="This endpoint allows an authenticated user to register for an event by providing the event ID in the URL path. It ensures that the user can only register once, that registration is still open (the event is upcoming and its registration deadline has not passed) and that the event has not reached its capacity.",
 )
 class EventRegistrationView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
+    throttle_scope = "event_registration"
     serializer_class = EventRegistrationResponseSerializer
 
     def post(self, request, event_id, *args, **kwargs):
-        event = get_object_or_404(EventModel, id=event_id)
-        user = request.user
-
-        # check if the user already registered
-        if event.participants.filter(id=user.id).exists():
-            return Response(
-                {"message": "You are already registered for this event."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        # Check if the participants exceed the capacity
-        total_participants = event.participants.count()
-        if total_participants >= event.capacity:
-            return Response(
-                {"message": "Event is full"}, status=status.HTTP_405_METHOD_NOT_ALLOWED
-            )
-
-        user.events_joined.add(event)
-        event.participants.add(user)
+        try:
+            total_participants = register_participant(event_id, request.user)
+        except RegistrationError as e:
+            return Response({"message": e.message}, status=e.status_code)
 
-        # Recalculate the total participants after adding the user
-        total_participants = event.participants.count()
         return Response(
             {
                 "message": "Event registration successful.",
@@ -317,10 +417,199 @@ class EventRegistrationView(generics.GenericAPIView):
     },
     description="Retrieve the details of an event and its participants.",
 )
-class EventDetailView(generics.RetrieveAPIView):
-    queryset = EventModel.objects.all()
+@query_budget(5)
+class EventDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
+    queryset = optimize_for_serializer(EventModel.objects.all(), EventDetailSerializer)
     serializer_class = EventDetailSerializer
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
-        return get_object_or_404(EventModel, id=self.kwargs["event_id"])
+        return get_object_or_404(self.get_queryset(), id=self.kwargs["event_id"])
+
+    def get_validators(self, request, *args, **kwargs):
+        event_id = self.kwargs["event_id"]
+        return self.make_validators(event_id, self.validator_row(event_id).first())
+
+    @staticmethod
+    def validator_row(event_id):
+        return EventModel.objects.filter(id=event_id).values_list(
+            "updated_at", "participant_count"
+        )
+
+    @staticmethod
+    def make_validators(event_id, row):
+        if row is None:
+            return None, None
+        updated_at, participant_count = row
+        etag = make_etag(event_id, updated_at.isoformat(), participant_count)
+        return etag, int(updated_at.timestamp())
+
+
+@extend_schema(
+    tags=["Events"],
+    request=None,
+    responses={
+        200: OpenApiResponse(
+            description="Hit/miss counts and hit ratio per cached endpoint group",
+            examples=[
+                OpenApiExample(
+                    "Cache Metrics",
+                    value={
+                        "events": {"hits": 950, "misses": 50, "hit_ratio": 0.95},
+                        "categories": {"hits": 99, "misses": 1, "hit_ratio": 0.99},
+                    },
+                )
+            ],
+        ),
+        403: ErrorSerializer,
+    },
+    summary="Response Cache Metrics",
+    description="Report hit/miss ratios of the shared response cache used by the event list and category endpoints. Only accessible by Admin users.",
+)
+class ResponseCacheMetricsView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated, IsGovernmentAuthority]
+
+    def get(self, request, *args, **kwargs):
+        return Response(metrics.snapshot(), status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    tags=["Events"],
+    request=None,
+    parameters=[
+        OpenApiParameter(
+            name="output",
+            type=str,
+            enum=list(EXPORT_FORMATS),
+            default="ndjson",
+            description="Export format: newline-delimited JSON or CSV",
+            location=OpenApiParameter.QUERY,
+        )
+    ],
+    responses={
+        (200, "application/x-ndjson"): OpenApiTypes.STR,
+        (200, "text/csv"): OpenApiTypes.STR,
+        400: ErrorSerializer,
+        403: ErrorSerializer,
+    },
+    summary="Export Events",
+    description="Stream every event matching the list filters as NDJSON or CSV, in ID order. Intended for bulk/analytics exports; memory use does not grow with the number of rows. Only accessible by Admin users.",
+)
+class EventExportView(generics.GenericAPIView):
+    queryset = EventModel.objects.all()
+    permission_classes = [IsAuthenticated, IsGovernmentAuthority]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = EventFilter
+    pagination_class = None
+
+    def get(self, request, *args, **kwargs):
+        output = request.query_params.get("output", "ndjson")
+        if output not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"Unsupported output '{output}'"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        content_type, render = EXPORT_FORMATS[output]
+        rows = export_rows(self.filter_queryset(self.get_queryset()))
+        response = StreamingHttpResponse(
+            buffered(render(rows)), content_type=content_type
+        )
+        response["Content-Disposition"] = f'attachment; filename="events.{output}"'
+        return response
+
+
+@extend_schema(
+    tags=["Events"],
+    request=None,
+    responses={200: EventCalendarSerializer(many=True), 400: ErrorSerializer},
+    summary="Event Calendar",
+    description="Count the events matching the list filters per local day or month between the required from and to dates (both inclusive). Days or months without events are left out.",
+)
+# The bearer token's user lookup and the grouped count.
+@query_budget(2)
+class EventCalendarView(CachedListMixin, generics.ListAPIView):
+    cache_namespace = EVENTS
+    queryset = EventModel.objects.all()
+    serializer_class = EventCalendarSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = EventCalendarFilter
+    pagination_class = None
+
+    def filter_queryset(self, queryset):
+        # The range uses the event_date index; only the rows in it are
+        # converted to local dates and grouped, all in one query.
+        period = self.request.query_params.get("period") or "day"
+        return (
+            super()
+            .filter_queryset(queryset)
+            .annotate(date=Trunc("event_date", period, output_field=DateField()))
+            .values("date")
+            .annotate(count=Count("pk"))
+            .order_by("date")
+        )
+
+
+@extend_schema(
+    tags=["Events"],
+    request=None,
+    parameters=[
+        OpenApiParameter(
+            name="facets",
+            type=str,
+            description=f"Comma separated facets to count: {', '.join(FACETS)} (default: all)",
+            location=OpenApiParameter.QUERY,
+        ),
+        OpenApiParameter(
+            name="facet_limit",
+            type=int,
+            description=f"Buckets returned per facet, at most {settings.EVENT_FACET_MAX_BUCKETS} (default: {settings.EVENT_FACET_BUCKETS})",
+            location=OpenApiParameter.QUERY,
+        ),
+    ],
+    responses={200: EventFacetsSerializer, 400: ErrorSerializer},
+    summary="Event List Facets",
+    description="Count the events matching the list filters and search per category, status and location, largest buckets first. Each facet is one grouped query, and results are cached next to the event list.",
+)
+# The bearer token's user lookup and one grouped query per facet.
+@query_budget(len(FACETS) + 1)
+class EventFacetsView(CachedListMixin, generics.GenericAPIView):
+    cache_namespace = EVENTS
+    cache_query_params = ("facets", "facet_limit")
+    queryset = EventModel.objects.all()
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, SearchFilter]
+    filterset_class = EventFilter
+    search_fields = ListEventView.search_fields
+    pagination_class = None
+
+    def get(self, request, *args, **kwargs):
+        requested = request.query_params.get("facets", "").split(",")
+        facets = list(
+            dict.fromkeys(facet.strip() for facet in requested if facet.strip())
+        )
+        facets = facets or list(FACETS)
+        unknown = [facet for facet in facets if facet not in FACETS]
+        if unknown:
+            return Response(
+                {"error": f"Unknown facets: {', '.join(unknown)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            limit = int(
+                request.query_params.get("facet_limit", settings.EVENT_FACET_BUCKETS)
+            )
+            if limit <= 0:
+                raise ValueError
+        except ValueError:
+            return Response(
+                {"error": "facet_limit must be a positive integer"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        limit = min(limit, settings.EVENT_FACET_MAX_BUCKETS)
+        return self.cached_response(request, self.count_facets, facets, limit)
+
+    def count_facets(self, request, facets, limit):
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(facet_counts(queryset, facets, limit))
@@ -1,6 +1,23 @@
 from django.contrib import admin
-from .models import CustomUser, ApiKey
+from .models import CustomUser, ApiKey, OutboxEmail
 
 
 admin.site.register(CustomUser)
-admin.site.register(ApiKey)
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ["subject", "status", "attempts", "next_attempt_at", "sent_at"]
+    list_filter = ["status"]
+
+
+@admin.register(ApiKey)
+class ApiKeyAdmin(admin.ModelAdmin):
+    list_display = ["prefix", "is_active", "created_at", "last_used_at"]
+    list_filter = ["is_active"]
+    readonly_fields = ["prefix", "hashed_key", "created_at", "last_used_at"]
+
+    def has_add_permission(self, request):
+        # Keys are issued with the generate_api_key command, which shows the
+        # raw key once; the admin could only store a hash nobody knows.
+        return False
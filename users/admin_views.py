@@ -7,8 +7,10 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from drf_spectacular.utils import extend_schema, OpenApiRequest
 from django.contrib.auth import authenticate
 from rest_framework_simplejwt.tokens import RefreshToken, TokenError
+from .tokens import RoleRefreshToken
 from .openapi_examples import admin_user_example, admin2_user_example
 from .permission import IsGovernmentAuthority, HasApiKey
+from .roles import GOVERNMENT_AUTHORITY
 from django.contrib.auth.models import Group
 
 
@@ -33,7 +35,7 @@ class CreateAdminView(generics.CreateAPIView):
 
     def add_user_to_group(self, user):
         # Since is_government_authority is always True for AdminSerializer
-        government_group = Group.objects.get(name="Government Authority")
+        government_group = Group.objects.get(name=GOVERNMENT_AUTHORITY)
         user.groups.add(government_group)
         print(f"Added {user.email} to Government Authority group.")
 
@@ -49,13 +51,14 @@ class CreateAdminView(generics.CreateAPIView):
 )
 class AdminUserLoginView(APIView):
     permission_classes = [AllowAny]
+    throttle_scope = "login"
 
     def post(self, request, *args, **kwargs):
         email = request.data.get("email")
         password = request.data.get("password")
         user = authenticate(request, email=email, password=password)
         if user is not None:
-            refresh_token = RefreshToken.for_user(user)
+            refresh_token = RoleRefreshToken.for_user(user)
             return Response(
                 {
                     "refresh": str(refresh_token),
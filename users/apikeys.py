@@ -0,0 +1,89 @@
+import hmac
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ApiKey
+
+
+def _cache():
+    return caches[settings.API_KEY_CACHE_ALIAS]
+
+
+def _key(hashed_key):
+    return f"apikey:{hashed_key}"
+
+
+def verify_api_key(raw_key):
+    """
+    Return the id of the active key matching ``raw_key``, or ``None``.
+
+    Verified keys are cached by hash for ``API_KEY_CACHE_TIMEOUT`` seconds,
+    so repeated requests with the same key do not query the database.
+    Unknown keys are never cached. A revoked key is evicted at once where
+    ``API_KEY_CACHE_ALIAS`` is shared by every process; with a per-process
+    cache, other processes keep accepting it until their entry expires.
+    """
+    if not raw_key:
+        return None
+    hashed_key = ApiKey.hash_key(raw_key)
+    cache = _cache()
+    key_id = cache.get(_key(hashed_key))
+    if key_id is not None:
+        return key_id
+
+    candidates = ApiKey.objects.filter(
+        prefix=raw_key[: ApiKey.PREFIX_LENGTH], is_active=True
+    ).values_list("pk", "hashed_key")
+    for pk, stored in candidates:
+        if hmac.compare_digest(stored, hashed_key):
+            cache.set(_key(hashed_key), pk, settings.API_KEY_CACHE_TIMEOUT)
+            return pk
+    return None
+
+
+def invalidate_api_keys(hashed_keys):
+    """Drop cached verifications now and again once the transaction commits."""
+    keys = [_key(hashed_key) for hashed_key in hashed_keys]
+    if not keys:
+        return
+    cache = _cache()
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+class UsageRecorder:
+    """
+    Collect the keys used in this process and write their ``last_used_at``
+    with a single UPDATE at most every ``API_KEY_USAGE_FLUSH_INTERVAL``
+    seconds, instead of a write per request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._flushed = time.monotonic()
+
+    def record(self, key_id):
+        with self._lock:
+            self._pending.add(key_id)
+            due = (
+                time.monotonic() - self._flushed
+                >= settings.API_KEY_USAGE_FLUSH_INTERVAL
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, set()
+            self._flushed = time.monotonic()
+        if pending:
+            ApiKey.objects.filter(pk__in=pending).update(last_used_at=timezone.now())
+
+
+usage = UsageRecorder()
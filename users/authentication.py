@@ -0,0 +1,171 @@
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .roles import ROLES_CLAIM
+from .tokens import EMAIL_CLAIM, GOVERNMENT_AUTHORITY_CLAIM, SESSION_CLAIM
+
+STATELESS_CLAIMS = (
+    api_settings.USER_ID_CLAIM,
+    EMAIL_CLAIM,
+    GOVERNMENT_AUTHORITY_CLAIM,
+    ROLES_CLAIM,
+    SESSION_CLAIM,
+)
+
+
+class ClaimsUser(TokenUser):
+    """A user built from access token claims; it has no database row."""
+
+    @cached_property
+    def email(self):
+        return self.token[EMAIL_CLAIM]
+
+    @cached_property
+    def is_government_authority(self):
+        return self.token[GOVERNMENT_AUTHORITY_CLAIM]
+
+    @cached_property
+    def _group_names(self):
+        # Read by users.roles.get_user_groups in place of a lookup.
+        return frozenset(self.token[ROLES_CLAIM])
+
+    @property
+    def is_resident(self):
+        return not self.is_government_authority and not self.is_superuser
+
+    def __str__(self):
+        return self.email
+
+
+class RevokedSessions:
+    """
+    The refresh token jtis on the blacklist, reloaded in one query at most
+    every ``JWT_REVOCATION_REFRESH`` seconds. Tokens blacklisted in this
+    process are added straight away; elsewhere they are seen on the next
+    reload.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jtis = frozenset()
+        self._loaded = None
+
+    def _reload(self):
+        jtis = BlacklistedToken.objects.filter(
+            token__expires_at__gt=timezone.now()
+        ).values_list("token__jti", flat=True)
+        self._jtis = frozenset(jtis)
+        self._loaded = time.monotonic()
+
+    def _stale(self):
+        return (
+            self._loaded is None
+            or time.monotonic() - self._loaded >= settings.JWT_REVOCATION_REFRESH
+        )
+
+    def __contains__(self, jti):
+        with self._lock:
+            if self._stale():
+                self._reload()
+            return jti in self._jtis
+
+    async def acontains(self, jti):
+        if self._stale():
+            await sync_to_async(self._reload_locked)()
+        return jti in self._jtis
+
+    def _reload_locked(self):
+        with self._lock:
+            if self._stale():
+                self._reload()
+
+    def add(self, jti):
+        with self._lock:
+            self._jtis = self._jtis | {jti}
+
+    def reset(self):
+        with self._lock:
+            self._jtis, self._loaded = frozenset(), None
+
+
+revoked_sessions = RevokedSessions()
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the signed claims instead of loading the
+    user on every request; ``request.user`` is a ``ClaimsUser``.
+
+    Views that need the real row (to save it, or to read fields that are
+    not in the token) set ``requires_user_row = True`` and get the model
+    instance as usual. Tokens issued without the claims are handled the
+    same way. Revoked sessions are refused within ``JWT_REVOCATION_REFRESH``
+    seconds of their refresh token being blacklisted.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+
+        session = validated_token.get(SESSION_CLAIM)
+        if session is not None and session in revoked_sessions:
+            raise AuthenticationFailed("Token has been revoked", code="token_revoked")
+
+        view = (request.parser_context or {}).get("view")
+        stateless = all(claim in validated_token for claim in STATELESS_CLAIMS)
+        if stateless and not getattr(view, "requires_user_row", False):
+            return ClaimsUser(validated_token), validated_token
+        return self.get_user(validated_token), validated_token
+
+
+async def aauthenticate(request, requires_user_row=False):
+    """
+    Authenticate a plain async Django view the way the configured JWT
+    authentication class would, without the thread hop of DRF's sync
+    dispatch. Returns the user, or ``None`` when there is no bearer token;
+    invalid tokens and unknown or inactive users raise the same exceptions
+    as DRF.
+    """
+    authentication = StatelessJWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = header and authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+    validated_token = authentication.get_validated_token(raw_token)
+
+    if settings.JWT_STATELESS_AUTH:
+        session = validated_token.get(SESSION_CLAIM)
+        if session is not None and await revoked_sessions.acontains(session):
+            raise AuthenticationFailed("Token has been revoked", code="token_revoked")
+        stateless = all(claim in validated_token for claim in STATELESS_CLAIMS)
+        if stateless and not requires_user_row:
+            return ClaimsUser(validated_token)
+
+    try:
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+    except KeyError:
+        raise InvalidToken("Token contained no recognizable user identification")
+    try:
+        user = await authentication.user_model.objects.aget(
+            **{api_settings.USER_ID_FIELD: user_id}
+        )
+    except authentication.user_model.DoesNotExist:
+        raise AuthenticationFailed("User not found", code="user_not_found")
+    if not user.is_active:
+        raise AuthenticationFailed("User is inactive", code="user_inactive")
+    return user
@@ -0,0 +1,95 @@
+import json
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from users.models import CustomUser
+from users.views import UserLoginView, UserLogoutView
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure resident login/logout throughput and queries per request for "
+        "each session engine"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=500)
+        parser.add_argument(
+            "--engines",
+            default=",".join(settings.SESSION_ENGINES),
+            help=f"Comma separated, from: {', '.join(settings.SESSION_ENGINES)}",
+        )
+        parser.add_argument(
+            "--real-hasher",
+            action="store_true",
+            help="Keep the configured password hasher instead of a fast one, "
+            "which otherwise dominates the timings",
+        )
+
+    def handle(self, *args, **options):
+        hashers = (
+            settings.PASSWORD_HASHERS
+            if options["real_hasher"]
+            else ["django.contrib.auth.hashers.MD5PasswordHasher"]
+        )
+        for name in options["engines"].split(","):
+            engine = settings.SESSION_ENGINES[name]
+            with override_settings(SESSION_ENGINE=engine, PASSWORD_HASHERS=hashers):
+                self.run_engine(name, options["iterations"])
+
+    def wrap(self, view):
+        # The session and auth middleware are what differ between engines;
+        # throttling is off so the loop measures sessions only.
+        return SessionMiddleware(
+            AuthenticationMiddleware(view.as_view(throttle_classes=[]))
+        )
+
+    def call(self, handler, path, data=None, cookies=None):
+        request = RequestFactory().post(
+            path, json.dumps(data or {}), content_type="application/json"
+        )
+        request.COOKIES.update(cookies or {})
+        request._dont_enforce_csrf_checks = True
+        return handler(request)
+
+    def run_engine(self, name, iterations):
+        email = f"bench-session-{uuid.uuid4().hex[:8]}@example.invalid"
+        user = CustomUser.objects.create_user(email=email, password="bench-password")
+        login, logout = self.wrap(UserLoginView), self.wrap(UserLogoutView)
+        credentials = {"email": email, "password": "bench-password"}
+        cookie = settings.SESSION_COOKIE_NAME
+        sessions_before = Session.objects.count()
+
+        login_queries = logout_queries = 0
+        started = time.perf_counter()
+        for _ in range(iterations):
+            connection.queries_log.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.call(login, reverse("login"), credentials)
+            assert response.status_code == 200, response.status_code
+            login_queries += len(queries)
+
+            cookies = {cookie: response.cookies[cookie].value}
+            with CaptureQueriesContext(connection) as queries:
+                response = self.call(logout, reverse("logout"), cookies=cookies)
+            assert response.status_code == 200, response.status_code
+            logout_queries += len(queries)
+        elapsed = time.perf_counter() - started
+
+        left = Session.objects.count() - sessions_before
+        user.delete()
+        self.stdout.write(
+            f"{name:<15} {iterations / elapsed:>8.1f} login+logout/s  "
+            f"{login_queries / iterations:.1f} queries/login  "
+            f"{logout_queries / iterations:.1f} queries/logout  "
+            f"{left} session rows left"
+        )
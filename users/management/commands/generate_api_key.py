@@ -1,10 +1,36 @@
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from users.apikeys import invalidate_api_keys
 from users.models import ApiKey
 
 
 class Command(BaseCommand):
-    help = "Generates a new API key"
+    help = "Generates new API keys, optionally deactivating every active key"
 
-    def handle(self, *args, **kwargs):
-        api_key = ApiKey.create_key()
-        self.stdout.write(self.style.SUCCESS(f"Generated new API key: {api_key.key}"))
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count", type=int, default=1, help="Number of keys to generate"
+        )
+        parser.add_argument(
+            "--rotate",
+            action="store_true",
+            help="Deactivate all currently active keys in the same transaction",
+        )
+
+    def handle(self, *args, **options):
+        built = [ApiKey.build() for _ in range(options["count"])]
+
+        with transaction.atomic():
+            if options["rotate"]:
+                active = ApiKey.objects.select_for_update().filter(is_active=True)
+                hashed_keys = list(active.values_list("hashed_key", flat=True))
+                active.update(is_active=False)
+                invalidate_api_keys(hashed_keys)
+                self.stdout.write(f"Deactivated {len(hashed_keys)} API key(s)")
+            ApiKey.objects.bulk_create(api_key for api_key, _ in built)
+
+        self.stdout.write(
+            "Store these keys now; they are not saved and cannot be shown again."
+        )
+        for _, raw_key in built:
+            self.stdout.write(self.style.SUCCESS(f"Generated new API key: {raw_key}"))
@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from users.outbox import deliver_outbox
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox emails, once or continuously with --loop"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop", action="store_true", help="Keep running until interrupted"
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=settings.EMAIL_OUTBOX_INTERVAL,
+            help="Seconds to wait when the outbox is empty with --loop",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help="Emails sent per mail connection",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            sent, failed = deliver_outbox(batch_size=options["batch_size"])
+            if sent or failed:
+                self.stdout.write(f"Sent {sent}, failed {failed}")
+            if not options["loop"]:
+                if not (sent or failed):
+                    self.stdout.write("Outbox is empty")
+                return
+            if sent + failed < options["batch_size"]:
+                try:
+                    time.sleep(options["interval"])
+                except KeyboardInterrupt:
+                    return
@@ -0,0 +1,60 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired sessions in small batches, once or continuously with "
+        "--loop, without holding a long table lock like clearsessions"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.05,
+            help="Seconds to sleep between batches so writers can get in",
+        )
+        parser.add_argument(
+            "--loop", action="store_true", help="Keep running until interrupted"
+        )
+        parser.add_argument(
+            "--interval", type=int, default=3600, help="Seconds between sweeps"
+        )
+
+    def handle(self, *args, **options):
+        if not settings.SESSION_ENGINE.endswith(("backends.db", "backends.cached_db")):
+            self.stdout.write(f"{settings.SESSION_ENGINE} keeps no session rows")
+            return
+
+        while True:
+            close_old_connections()
+            deleted = self.sweep(options["batch_size"], options["pause"])
+            self.stdout.write(f"Deleted {deleted} expired session(s)")
+            if not options["loop"]:
+                return
+            try:
+                time.sleep(options["interval"])
+            except KeyboardInterrupt:
+                return
+
+    def sweep(self, batch_size, pause):
+        deleted = 0
+        now = timezone.now()
+        while True:
+            # expire_date is indexed, so each batch is a short range read.
+            keys = list(
+                Session.objects.filter(expire_date__lt=now).values_list(
+                    "session_key", flat=True
+                )[:batch_size]
+            )
+            if not keys:
+                return deleted
+            deleted += Session.objects.filter(session_key__in=keys).delete()[0]
+            time.sleep(pause)
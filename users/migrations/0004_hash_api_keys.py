@@ -0,0 +1,62 @@
+import hashlib
+import hmac
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def hash_existing_keys(apps, schema_editor):
+    ApiKey = apps.get_model("users", "ApiKey")
+    secret = settings.API_KEY_SECRET.encode()
+    for api_key in ApiKey.objects.using(schema_editor.connection.alias):
+        api_key.prefix = api_key.key[:8]
+        api_key.hashed_key = hmac.new(
+            secret, api_key.key.encode(), hashlib.sha256
+        ).hexdigest()
+        api_key.save(
+            update_fields=["prefix", "hashed_key"], using=schema_editor.connection.alias
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0003_outboxemail"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="apikey",
+            name="prefix",
+            field=models.CharField(db_index=True, default="", max_length=8),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="apikey",
+            name="hashed_key",
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name="apikey",
+            name="created_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name="apikey",
+            name="last_used_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        # Existing plaintext keys keep working: hash them, then drop the
+        # plaintext column. This cannot be reversed.
+        migrations.RunPython(hash_existing_keys),
+        migrations.RemoveField(
+            model_name="apikey",
+            name="key",
+        ),
+        migrations.AlterField(
+            model_name="apikey",
+            name="hashed_key",
+            field=models.CharField(max_length=64, unique=True),
+        ),
+    ]
@@ -1,7 +1,11 @@
 from django.utils.translation import gettext_lazy as _
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 from .manager import CustomUserManger
+import hashlib
+import hmac
 import secrets
 
 
@@ -36,13 +40,80 @@ class CustomUser(AbstractUser):
 
 
 class ApiKey(models.Model):
-    key = models.CharField(max_length=64, unique=True)
+    """
+    An API key. Only a keyed hash of the key is stored, plus its first
+    ``PREFIX_LENGTH`` characters to find candidate rows and to tell keys
+    apart; the key itself is shown once, when it is created.
+    """
+
+    PREFIX_LENGTH = 8
+
+    prefix = models.CharField(max_length=PREFIX_LENGTH, db_index=True)
+    hashed_key = models.CharField(max_length=64, unique=True)
     is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    last_used_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.prefix}..."
 
+    @staticmethod
     def generate_key():
-        return secrets.token_urlsafe(32)
+        return f"{secrets.token_hex(ApiKey.PREFIX_LENGTH // 2)}.{secrets.token_urlsafe(32)}"
+
+    @staticmethod
+    def hash_key(raw_key):
+        return hmac.new(
+            settings.API_KEY_SECRET.encode(), raw_key.encode(), hashlib.sha256
+        ).hexdigest()
+
+    @classmethod
+    def build(cls):
+        """Return an unsaved key and the raw key, which is never stored."""
+        raw_key = cls.generate_key()
+        return (
+            cls(prefix=raw_key[: cls.PREFIX_LENGTH], hashed_key=cls.hash_key(raw_key)),
+            raw_key,
+        )
 
     @classmethod
     def create_key(cls):
-        key = cls.generate_key()
-        return cls.objects.create(key=key)
+        api_key, raw_key = cls.build()
+        api_key.save()
+        return api_key, raw_key
+
+
+class OutboxEmail(models.Model):
+    """
+    An email waiting to be delivered. Rows are written in the same
+    transaction as the change that triggers them and sent by the
+    ``send_outbox_emails`` worker, so requests never wait on SMTP.
+    """
+
+    PENDING = "PENDING"
+    SENT = "SENT"
+    FAILED = "FAILED"
+    STATUS_CHOICES = {
+        PENDING: "PENDING",
+        SENT: "SENT",
+        FAILED: "FAILED",
+    }
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)}"
@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+# How long a claimed batch is hidden from other workers while it is sent.
+CLAIM_TIMEOUT = timedelta(minutes=5)
+
+
+def _claim(batch_size, now):
+    ids = list(
+        OutboxEmail.objects.filter(status=OutboxEmail.PENDING, next_attempt_at__lte=now)
+        .order_by("next_attempt_at")
+        .values_list("pk", flat=True)[:batch_size]
+    )
+    if not ids:
+        return []
+    # Push the claimed rows into the future; the unique timestamp tells this
+    # worker which rows it won if another worker raced for the same ids.
+    lease = now + CLAIM_TIMEOUT
+    OutboxEmail.objects.filter(
+        pk__in=ids, status=OutboxEmail.PENDING, next_attempt_at__lte=now
+    ).update(next_attempt_at=lease)
+    return list(OutboxEmail.objects.filter(pk__in=ids, next_attempt_at=lease))
+
+
+def _retry_delay(attempts):
+    return timedelta(seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def _record_failure(email, error, now):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = OutboxEmail.FAILED
+    else:
+        email.next_attempt_at = now + _retry_delay(email.attempts)
+    email.save(update_fields=["attempts", "last_error", "status", "next_attempt_at"])
+
+
+def deliver_outbox(batch_size=None):
+    """
+    Send one batch of due outbox emails over a single mail connection.
+
+    Delivered rows are marked SENT in one UPDATE. A failed row is retried
+    with exponential backoff (``EMAIL_OUTBOX_RETRY_DELAY`` doubled per
+    attempt) and marked FAILED after ``EMAIL_OUTBOX_MAX_ATTEMPTS``.
+    Returns ``(sent, failed)`` counts for the batch.
+    """
+    now = timezone.now()
+    emails = _claim(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE, now)
+    if not emails:
+        return 0, 0
+
+    sent, failed = [], []
+    try:
+        with get_connection() as connection:
+            for email in emails:
+                message = EmailMessage(
+                    email.subject,
+                    email.body,
+                    email.from_email,
+                    email.to,
+                    connection=connection,
+                )
+                try:
+                    message.send()
+                    sent.append(email.pk)
+                except Exception as e:
+                    failed.append((email, e))
+    except Exception as e:
+        # Opening or closing the connection failed; retry whatever was not sent.
+        failed = [(email, e) for email in emails if email.pk not in sent]
+
+    if sent:
+        OutboxEmail.objects.filter(pk__in=sent).update(
+            status=OutboxEmail.SENT, sent_at=timezone.now(), last_error=""
+        )
+    for email, error in failed:
+        _record_failure(email, error, now)
+    return len(sent), len(failed)
@@ -1,18 +1,19 @@
 from rest_framework import permissions
-from .models import ApiKey
+from .apikeys import usage, verify_api_key
+from .roles import GOVERNMENT_AUTHORITY, get_request_groups
 
 
 class HasApiKey(permissions.BasePermission):
     def has_permission(self, request, view):
-        api_key = request.headers.get("Authorization")
-        if not api_key:
+        key_id = verify_api_key(request.headers.get("Authorization"))
+        if key_id is None:
             return False
-        return ApiKey.objects.filter(key=api_key, is_active=True).exists()
+        usage.record(key_id)
+        return True
 
 
 class IsGovernmentAuthority(permissions.BasePermission):
     def has_permission(self, request, view):
-        return (
-            request.user
-            and request.user.groups.filter(name="Government Authority").exists()
+        return bool(request.user) and GOVERNMENT_AUTHORITY in get_request_groups(
+            request
         )
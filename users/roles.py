@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.core.cache import caches
+from django.db import transaction
+
+GOVERNMENT_AUTHORITY = "Government Authority"
+RESIDENTS = "Residents"
+
+# Access token claim carrying the user's group names.
+ROLES_CLAIM = "groups"
+
+
+class _LocalRoleCache:
+    """Small thread-safe LRU of ``user_id -> group names`` with a short TTL."""
+
+    def __init__(self, size, ttl):
+        self.size, self.ttl = size, ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            groups, expires = entry
+            if expires < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return groups
+
+    def set(self, user_id, groups):
+        with self._lock:
+            self._entries[user_id] = (groups, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def discard(self, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_cache = _LocalRoleCache(
+    settings.ROLE_CACHE_LOCAL_SIZE, settings.ROLE_CACHE_LOCAL_TTL
+)
+
+
+def _shared_cache():
+    return caches[settings.ROLE_CACHE_ALIAS]
+
+
+def _key(user_id):
+    return f"roles:{user_id}"
+
+
+def get_group_names(user_id):
+    """
+    Return the frozenset of group names for ``user_id``, looking in the
+    process-local LRU, then the shared cache, then the database.
+    """
+    groups = local_cache.get(user_id)
+    if groups is not None:
+        return groups
+
+    names = _shared_cache().get(_key(user_id))
+    if names is None:
+        names = sorted(
+            Group.objects.filter(user__pk=user_id).values_list("name", flat=True)
+        )
+        _shared_cache().set(_key(user_id), names, settings.ROLE_CACHE_TIMEOUT)
+    groups = frozenset(names)
+    local_cache.set(user_id, groups)
+    return groups
+
+
+def get_user_groups(user):
+    """Group names for ``user``, resolved at most once per user instance."""
+    if not user or not user.is_authenticated:
+        return frozenset()
+    groups = getattr(user, "_group_names", None)
+    if groups is None:
+        groups = user._group_names = get_group_names(user.pk)
+    return groups
+
+
+def get_request_groups(request):
+    """
+    Group names for the request's user. Access tokens that already carry
+    the roles claim are trusted as is, without touching cache or database.
+    """
+    token = request.auth
+    if token is not None and hasattr(token, "payload") and ROLES_CLAIM in token.payload:
+        return frozenset(token.payload[ROLES_CLAIM])
+    return get_user_groups(request.user)
+
+
+def invalidate_user_groups(user_ids):
+    """
+    Forget cached group names for ``user_ids``. The shared entries are
+    dropped once the transaction commits so no reader can re-cache the old
+    membership in between. Other processes' local entries expire within
+    ``ROLE_CACHE_LOCAL_TTL`` seconds.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    local_cache.discard(user_ids)
+
+    def drop():
+        local_cache.discard(user_ids)
+        _shared_cache().delete_many([_key(user_id) for user_id in user_ids])
+
+    transaction.on_commit(drop)
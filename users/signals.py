@@ -1,15 +1,71 @@
-from django.db.models.signals import post_save, post_migrate
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_migrate,
+    post_save,
+    pre_delete,
+)
 from django.contrib.contenttypes.models import ContentType
 from django.dispatch import receiver
 from django.contrib.auth.models import Group, Permission
 from events.models import EventModel, Category
-from .models import CustomUser
+from .apikeys import invalidate_api_keys
+from .models import ApiKey, CustomUser
+from .roles import RESIDENTS, invalidate_user_groups
 from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from .authentication import revoked_sessions
 
 
 @receiver(post_save, sender=CustomUser)
 def add_user_to_group(sender, instance, created, **kwargs):
     if created:
-        resident_group, created = Group.objects.get_or_create(name="Residents")
+        resident_group, created = Group.objects.get_or_create(name=RESIDENTS)
         instance.groups.add(resident_group)
         # print(f"Added {instance.email} to Residents group.")
+
+
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+def invalidate_cached_groups(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # ``instance`` is a Group; a clear removes every member, so note who
+        # they were before the rows go.
+        if action == "pre_clear":
+            instance._cleared_user_ids = list(
+                instance.user_set.values_list("pk", flat=True)
+            )
+        elif action == "post_clear":
+            invalidate_user_groups(getattr(instance, "_cleared_user_ids", []))
+        elif action in ("post_add", "post_remove"):
+            invalidate_user_groups(pk_set)
+    elif action in ("post_add", "post_remove", "post_clear"):
+        instance.__dict__.pop("_group_names", None)
+        invalidate_user_groups([instance.pk])
+
+
+@receiver(post_save, sender=Group)
+def invalidate_renamed_group(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_user_groups(instance.user_set.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Group)
+def invalidate_deleted_group(sender, instance, **kwargs):
+    invalidate_user_groups(instance.user_set.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=ApiKey)
+def invalidate_deactivated_key(sender, instance, **kwargs):
+    if not instance.is_active:
+        invalidate_api_keys([instance.hashed_key])
+
+
+@receiver(post_delete, sender=ApiKey)
+def invalidate_deleted_key(sender, instance, **kwargs):
+    invalidate_api_keys([instance.hashed_key])
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def revoke_session(sender, instance, created, **kwargs):
+    if created:
+        revoked_sessions.add(instance.token.jti)
@@ -1 +1,312 @@
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth.models import Group
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.cache import caches
+from django.conf import settings
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.views import APIView
+
+from api.checks import check_session_cache
+from api.throttling import GCRAStore, store
+from events.views import ListEventView
+
+from .apikeys import usage, verify_api_key
+from .authentication import (
+    ClaimsUser,
+    StatelessJWTAuthentication,
+    revoked_sessions,
+)
+from .models import ApiKey, CustomUser, OutboxEmail
+from .outbox import deliver_outbox
+from .permission import HasApiKey, IsGovernmentAuthority
+from .roles import GOVERNMENT_AUTHORITY, _key, local_cache
+from .tokens import RoleRefreshToken
+
+
+class ConfirmationOutboxTest(TestCase):
+    def setUp(self):
+        store.clear()
+
+    def register(self, email="resident@example.com"):
+        return APIClient().post(
+            reverse("register"),
+            {
+                "email": email,
+                "password": "s3cret-Passw0rd",
+                "first_name": "Ada",
+                "last_name": "Lovelace",
+            },
+            format="json",
+        )
+
+    def test_signup_queues_email_without_sending(self):
+        response = self.register()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(mail.outbox), 0)
+        queued = OutboxEmail.objects.get()
+        self.assertEqual(queued.to, ["resident@example.com"])
+        self.assertIn(
+            reverse("confirm-email", args=[response.data["user_id"]]), queued.body
+        )
+
+    def test_worker_sends_batch_over_one_connection(self):
+        self.register("first@example.com")
+        self.register("second@example.com")
+
+        with mock.patch(
+            "users.outbox.get_connection", wraps=mail.get_connection
+        ) as get_connection:
+            self.assertEqual(deliver_outbox(), (2, 0))
+
+        get_connection.assert_called_once()
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertFalse(OutboxEmail.objects.exclude(status=OutboxEmail.SENT).exists())
+        self.assertEqual(deliver_outbox(), (0, 0))
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        self.register()
+
+        with mock.patch(
+            "django.core.mail.EmailMessage.send", side_effect=OSError("down")
+        ):
+            self.assertEqual(deliver_outbox(), (0, 1))
+
+        queued = OutboxEmail.objects.get()
+        self.assertEqual(queued.status, OutboxEmail.PENDING)
+        self.assertEqual(queued.attempts, 1)
+        self.assertEqual(queued.last_error, "down")
+        self.assertGreater(queued.next_attempt_at, queued.created_at)
+        # Not due yet, so the next run leaves it alone.
+        self.assertEqual(deliver_outbox(), (0, 0))
+        self.assertTrue(
+            CustomUser.objects.filter(email="resident@example.com").exists()
+        )
+
+
+class RoleCacheTest(TestCase):
+    def setUp(self):
+        local_cache.clear()
+        caches[settings.ROLE_CACHE_ALIAS].clear()
+        self.group = Group.objects.create(name=GOVERNMENT_AUTHORITY)
+        self.user = CustomUser.objects.create_user(email="officer@example.com")
+
+    def check(self, user, auth=None):
+        request = SimpleNamespace(user=user, auth=auth)
+        return IsGovernmentAuthority().has_permission(request, None)
+
+    def fresh_user(self):
+        return CustomUser.objects.get(pk=self.user.pk)
+
+    def test_membership_is_cached_across_requests(self):
+        self.assertFalse(self.check(self.fresh_user()))
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertFalse(self.check(user))
+
+    def test_group_changes_invalidate_cache(self):
+        self.assertFalse(self.check(self.fresh_user()))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.add(self.group)
+        self.assertTrue(self.check(self.fresh_user()))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.user_set.remove(self.user)
+        self.assertFalse(self.check(self.fresh_user()))
+
+    def test_revocation_reaches_other_workers(self):
+        with tempfile.TemporaryDirectory() as location, self.settings(
+            CACHES={
+                **settings.CACHES,
+                settings.ROLE_CACHE_ALIAS: {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": location,
+                },
+            }
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.groups.add(self.group)
+            self.assertTrue(self.check(self.fresh_user()))
+            # Another worker's connection to the same shared cache.
+            other = caches.create_connection(settings.ROLE_CACHE_ALIAS)
+            self.assertIn(GOVERNMENT_AUTHORITY, other.get(_key(self.user.pk)))
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.group.user_set.remove(self.user)
+            self.assertIsNone(other.get(_key(self.user.pk)))
+
+    def test_access_token_claim_needs_no_queries(self):
+        self.user.groups.add(self.group)
+        access = RoleRefreshToken.for_user(self.user).access_token
+        local_cache.clear()
+        caches[settings.ROLE_CACHE_ALIAS].clear()
+        with self.assertNumQueries(0):
+            self.assertTrue(self.check(self.user, auth=access))
+
+
+class ApiKeyTest(TestCase):
+    def setUp(self):
+        caches[settings.API_KEY_CACHE_ALIAS].clear()
+        self.api_key, self.raw_key = ApiKey.create_key()
+
+    def check(self, raw_key):
+        request = SimpleNamespace(headers={"Authorization": raw_key})
+        return HasApiKey().has_permission(request, None)
+
+    def test_only_hash_is_stored(self):
+        self.assertNotIn(self.raw_key, self.api_key.hashed_key)
+        self.assertTrue(self.raw_key.startswith(self.api_key.prefix))
+        self.assertEqual(self.api_key.hashed_key, ApiKey.hash_key(self.raw_key))
+
+    def test_verified_key_is_cached_until_deactivated(self):
+        self.assertTrue(self.check(self.raw_key))
+        with self.assertNumQueries(0):
+            self.assertTrue(self.check(self.raw_key))
+        self.assertFalse(self.check(self.raw_key + "x"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api_key.is_active = False
+            self.api_key.save()
+        self.assertFalse(self.check(self.raw_key))
+
+    def test_rotation_evicts_cached_verifications(self):
+        self.assertTrue(self.check(self.raw_key))
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("generate_api_key", rotate=True, stdout=StringIO())
+        self.assertFalse(self.check(self.raw_key))
+
+    def test_last_used_is_written_on_flush(self):
+        usage.record(verify_api_key(self.raw_key))
+        usage.flush()
+        self.api_key.refresh_from_db()
+        self.assertIsNotNone(self.api_key.last_used_at)
+
+
+class StatelessJWTAuthenticationTest(TestCase):
+    def setUp(self):
+        caches[settings.RESPONSE_CACHE_ALIAS].clear()
+        revoked_sessions.reset()
+        self.user = CustomUser.objects.create_user(email="officer@example.com")
+        self.refresh = RoleRefreshToken.for_user(self.user)
+        self.access = str(self.refresh.access_token)
+
+    def authenticate(self, view=None):
+        request = APIView().initialize_request(
+            APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {self.access}")
+        )
+        request.parser_context["view"] = view
+        return StatelessJWTAuthentication().authenticate(request)
+
+    def test_claims_user_without_queries(self):
+        self.authenticate()  # loads the revocation list once
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate()
+        self.assertIsInstance(user, ClaimsUser)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.email, "officer@example.com")
+
+    def test_views_needing_the_row_get_the_model(self):
+        user, _ = self.authenticate(view=SimpleNamespace(requires_user_row=True))
+        self.assertIsInstance(user, CustomUser)
+
+    def test_blacklisted_session_is_refused(self):
+        self.authenticate()
+        self.refresh.blacklist()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_cached_event_list_needs_no_queries(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access}")
+        with mock.patch.object(
+            ListEventView, "authentication_classes", [StatelessJWTAuthentication]
+        ):
+            client.get(reverse("list-event"))
+            response = client.get(reverse("list-event"))
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(response["X-Query-Count"], "0")
+
+
+class SharedThrottleTest(TestCase):
+    def test_gcra_admits_burst_then_spaces_requests(self):
+        throttle = GCRAStore(":memory:")
+        self.assertIsNone(throttle.hit("ip", 2, 60, now=1000))
+        self.assertIsNone(throttle.hit("ip", 2, 60, now=1000))
+        self.assertEqual(throttle.hit("ip", 2, 60, now=1000), 30)
+        self.assertIsNone(throttle.hit("ip", 2, 60, now=1030))
+        self.assertIsNone(throttle.hit("other", 2, 60, now=1030))
+
+    def test_state_is_shared_between_processes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "throttle.sqlite3"
+            # Separate stores stand in for separate gunicorn workers.
+            first, second = GCRAStore(path), GCRAStore(path)
+            self.assertIsNone(first.hit("ip", 1, 60, now=1000))
+            self.assertIsNotNone(second.hit("ip", 1, 60, now=1000))
+
+    def test_login_scope_is_enforced(self):
+        store.clear()
+        client = APIClient()
+        for _ in range(10):
+            response = client.post(reverse("login"), {"email": "x@example.com"})
+            self.assertEqual(response.status_code, 400)
+        response = client.post(reverse("login"), {"email": "x@example.com"})
+        self.assertEqual(response.status_code, 429)
+
+
+class SessionStorageTest(TestCase):
+    CACHED_DB = "django.contrib.sessions.backends.cached_db"
+
+    def test_cached_db_needs_a_shared_cache(self):
+        with self.settings(SESSION_ENGINE=self.CACHED_DB):
+            self.assertEqual(
+                [error.id for error in check_session_cache(None)], ["api.E001"]
+            )
+            shared = {
+                **settings.CACHES,
+                settings.SESSION_CACHE_ALIAS: {
+                    "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+                    "LOCATION": "response_cache",
+                },
+            }
+            with self.settings(CACHES=shared):
+                self.assertEqual(check_session_cache(None), [])
+        self.assertEqual(check_session_cache(None), [])
+
+    def test_sweep_deletes_expired_sessions_in_batches(self):
+        now = timezone.now()
+        for index in range(5):
+            Session.objects.create(
+                session_key=f"expired{index}",
+                session_data="",
+                expire_date=now - timedelta(minutes=index + 1),
+            )
+        Session.objects.create(
+            session_key="live", session_data="", expire_date=now + timedelta(days=1)
+        )
+        out = StringIO()
+        call_command("sweep_sessions", batch_size=2, pause=0, stdout=out)
+        self.assertIn("Deleted 5 expired session(s)", out.getvalue())
+        self.assertEqual(
+            list(Session.objects.values_list("session_key", flat=True)), ["live"]
+        )
+
+    def test_sweep_skips_cookie_sessions(self):
+        out = StringIO()
+        with self.settings(
+            SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies"
+        ):
+            call_command("sweep_sessions", stdout=out)
+        self.assertIn("keeps no session rows", out.getvalue())
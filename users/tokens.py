@@ -0,0 +1,43 @@
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import CustomUser
+from .roles import ROLES_CLAIM, get_group_names
+
+# Access token claims read by users.authentication.StatelessJWTAuthentication.
+EMAIL_CLAIM = "email"
+GOVERNMENT_AUTHORITY_CLAIM = "is_government_authority"
+# The refresh token's jti, so blacklisting it also revokes its access tokens.
+SESSION_CLAIM = "sid"
+
+
+class RoleRefreshToken(RefreshToken):
+    """
+    Refresh token whose access tokens carry the user's email, authority flag
+    and group names, so requests can be authorized without loading the user.
+    The claims are re-read on every refresh; a change takes effect within
+    one access token lifetime.
+    """
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        user_id = self.payload[api_settings.USER_ID_CLAIM]
+        user = (
+            CustomUser.objects.filter(pk=user_id, is_active=True)
+            .values("email", "is_government_authority")
+            .first()
+        )
+        if user is None:
+            raise TokenError("User not found or inactive")
+        access[EMAIL_CLAIM] = user["email"]
+        access[GOVERNMENT_AUTHORITY_CLAIM] = user["is_government_authority"]
+        access[ROLES_CLAIM] = sorted(get_group_names(user_id))
+        access[SESSION_CLAIM] = self.payload[api_settings.JTI_CLAIM]
+        return access
+
+
+class RoleTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = RoleRefreshToken
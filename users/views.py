@@ -3,7 +3,6 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.contrib.auth import authenticate, login, logout
-from django.contrib.sessions.models import Session
 from django.middleware.csrf import get_token
 from django.urls import reverse
 from django.shortcuts import render
@@ -29,6 +28,7 @@ from .openapi_examples import (
     update_user_profile_examples,
 )
 from api.utils import send_confirmation_email
+from api.query_budget import query_budget
 
 
 @extend_schema(
@@ -48,6 +48,7 @@ class UserRegisterView(generics.CreateAPIView):
     queryset = CustomUser.objects.all()
     serializer_class = CustomUserSerializer
     permission_classes = [AllowAny]
+    throttle_scope = "signup"
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -134,6 +135,7 @@ class ConfirmEmailView(APIView):
 )
 class UserLoginView(APIView):
     permission_classes = [AllowAny]
+    throttle_scope = "login"
 
     def post(self, request, *args, **kwargs):
         email = request.data.get("email")
@@ -141,8 +143,8 @@ class UserLoginView(APIView):
         user = authenticate(request, email=email, password=password)
         if user is not None:
             login(request, user)
+            # SessionMiddleware saves the session once, with the response.
             request.session["email"] = email
-            request.session.save()
             csrf_token = get_token(request)
             return Response(
                 {"message": "Login successful", "csrf_token": csrf_token},
@@ -166,20 +168,21 @@ class UserLogoutView(generics.GenericAPIView):
     serializer_class = MessageSerializer
 
     def post(self, request, *args, **kwargs):
+        # logout() flushes the session, which deletes its stored row.
         logout(request)
-        session_key = request.session.session_key
-        if session_key:
-            Session.objects.filter(session_key=request.session.session_key).delete()
         return Response(
             {"message": "Logout Successful"},
             status=status.HTTP_200_OK,
         )
 
 
+@query_budget(4)
 class UserProfileView(generics.UpdateAPIView):
     queryset = CustomUser.objects.all()
     serializer_class = UserProfileSerializer
     permission_classes = [IsAuthenticated]
+    # The profile is read from and saved to request.user itself.
+    requires_user_row = True
 
     def get_object(self):
         return self.request.user